@@ -1,92 +1,183 @@
+"""Home/away charts with team logos as labels.
+
+The one set of matplotlib charts in the repo: home vs away bars for win rate
+and average score, and the win-rate and score-difference bars labelled with
+team logos. report.py embeds them in its static pages.
+
+Run without arguments to show the charts for team_metrics.csv interactively.
+With --out, render them for every season (and any team subsets) to PNG/SVG
+files in a process pool on the Agg backend:
+
+    python Visualization.py --out charts/ --format png --format svg
+    python Visualization.py --out charts/ --teams "CTBC Brothers,Uni-Lions"
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-
-# Load team metrics
-metrics = pd.read_csv('team_metrics.csv')
-
-# Sorted Win Rate Difference
-wr_sorted = metrics['win_rate_diff'].sort_values()
-teams = wr_sorted.index.tolist()
-diffs = wr_sorted.values
-
-teams       = metrics['home_team'].tolist()
-home_wr     = metrics['home_win_rate']
-away_wr     = metrics['away_win_rate']
-score_diff  = metrics['score_diff']
-x = list(range(len(teams)))
-plt.figure()
-plt.bar([i-0.2 for i in x], home_wr, width=0.4, label='Home Win Rate')
-plt.bar([i+0.2 for i in x], away_wr, width=0.4, label='Away Win Rate')
-plt.xticks(x, teams, rotation=45, ha='right')
-plt.ylabel('Win Rate')
-plt.title('Home vs Away Win Rates by Team')
-plt.legend()
-plt.tight_layout()
-plt.show()
-
-metrics = pd.read_csv('team_metrics.csv').set_index('home_team')
-# Prepare figure
-fig, ax = plt.subplots(figsize=(8, 6))
-y_pos = list(range(len(teams)))
-bars = ax.barh(y_pos, diffs, color='#0060B0')
-ax.axvline(0, color='gray', linewidth=1)
-
-# Remove default labels
-ax.set_yticks(y_pos)
-ax.set_yticklabels([])
-
-# Determine logo x-position (just at left margin)
-x_min, x_max = ax.get_xlim()
-x_logo = x_min + (x_max - x_min) * 0.02  # 2% in from left edge
-
-# Map team names to logo file paths
-logo_paths = {
-    "CTBC Brothers":    "logos/logo_brothers.png",
-    "WeiChuan Dragons": "logos/logo_dragon.png",
-    "Rakuten Monkeys":  "logos/logo_monkeys.png",
-    "Uni-Lions":        "logos/logo_lions.png",
-    "Fubon Guardians":  "logos/logo_fubon.png"
+
+import logos
+
+# season table column -> team_metrics.csv column
+TABLE_COLUMNS = {
+    'Home Win Rate': 'home_win_rate',
+    'Away Win Rate': 'away_win_rate',
+    'Win Rate Diff': 'win_rate_diff',
+    'Home Avg Score': 'home_avg_score',
+    'Away Avg Score': 'away_avg_score',
+    'Score Diff': 'score_diff',
 }
 
-# Add logos at original label positions
-for y, team in zip(y_pos, teams):
-    img = plt.imread(logo_paths[team])
-    imagebox = OffsetImage(img, zoom=0.25)  # increase zoom for larger logos
-    ab = AnnotationBbox(
-        imagebox, 
-        (x_logo, y),
-        frameon=False,
-        xycoords='data'
-    )
-    ax.add_artist(ab)
-
-ax.set_xlabel('Win Rate Difference (Home - Away)')
-ax.set_title('Win Rate Difference by Team (Logos as Labels)')
-plt.tight_layout()
-plt.show()
-
-# Repeat for Score Difference
-sd_sorted = metrics['score_diff'].sort_values()
-teams_sd = sd_sorted.index.tolist()
-diffs_sd = sd_sorted.values
-
-fig, ax = plt.subplots(figsize=(8, 6))
-bars = ax.barh(teams_sd, diffs_sd, color='#05AF7A')  # CPBL green
-
-# Remove default labels and add logos
-ax.set_yticks(y_pos)
-ax.set_yticklabels([])
-x_min, x_max = ax.get_xlim()
-x_logo = x_min + (x_max - x_min) * 0.02
-for y, team in zip(y_pos, teams_sd):
-    img = plt.imread(logo_paths[team])
-    imagebox = OffsetImage(img, zoom=0.25)
-    ab = AnnotationBbox(imagebox, (x_logo, y), frameon=False, xycoords='data')
-    ax.add_artist(ab)
-
-ax.axvline(0, color='gray', linewidth=1)
-ax.set_xlabel('Score Difference (Home - Away)')
-ax.set_title('Score Difference by Team (Logos as Labels)')
-plt.tight_layout()
-plt.show()
+
+def table_metrics(table):
+    """A `tables.team_table` frame in the team_metrics.csv layout, indexed by team."""
+    return table.set_index('Team')[list(TABLE_COLUMNS)].rename(columns=TABLE_COLUMNS)
+
+
+# ---- Charts ----
+def home_away_chart(plt, metrics, col, label, title):
+    teams = metrics.index.tolist()
+    x = list(range(len(teams)))
+    fig, ax = plt.subplots()
+    ax.bar([i-0.2 for i in x], metrics[f'home_{col}'], width=0.4, label=f'Home {label}')
+    ax.bar([i+0.2 for i in x], metrics[f'away_{col}'], width=0.4, label=f'Away {label}')
+    ax.set_xticks(x, teams, rotation=45, ha='right')
+    ax.set_ylabel(label)
+    ax.set_title(title)
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def logo_diff_chart(plt, metrics, col, color, xlabel, title):
+    """Sorted horizontal bars with each team's logo in place of its label."""
+    from matplotlib.offsetbox import AnnotationBbox, OffsetImage
+
+    diff = metrics[col].sort_values()
+    fig, ax = plt.subplots(figsize=(8, 6))
+    y_pos = list(range(len(diff)))
+    ax.barh(y_pos, diff.values, color=color)
+    ax.axvline(0, color='gray', linewidth=1)
+
+    # logos instead of tick labels, just in from the left edge
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels([])
+    x_min, x_max = ax.get_xlim()
+    x_logo = x_min + (x_max - x_min) * 0.02
+    for y, team in zip(y_pos, diff.index):
+        img = logos.logo_array(team, 64)
+        if img is None:
+            ax.annotate(team, (x_logo, y), va='center')
+            continue
+        ax.add_artist(AnnotationBbox(OffsetImage(img, zoom=0.5), (x_logo, y),
+                                     frameon=False, xycoords='data'))
+
+    ax.set_xlabel(xlabel)
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
+
+
+def charts(plt, metrics, label=''):
+    """(name, figure) for the four charts of one metrics table."""
+    suffix = f' ({label})' if label else ''
+    return [
+        ('win_rate', home_away_chart(plt, metrics, 'win_rate', 'Win Rate',
+                                     f'Home vs Away Win Rates by Team{suffix}')),
+        ('score', home_away_chart(plt, metrics, 'avg_score', 'Average Score',
+                                  f'Home vs Away Average Score by Team{suffix}')),
+        ('win_rate_diff', logo_diff_chart(plt, metrics, 'win_rate_diff', '#0060B0',
+                                          'Win Rate Difference (Home - Away)',
+                                          f'Win Rate Difference by Team{suffix}')),
+        ('score_diff', logo_diff_chart(plt, metrics, 'score_diff', '#05AF7A',
+                                       'Score Difference (Home - Away)',
+                                       f'Score Difference by Team{suffix}')),
+    ]
+
+
+# ---- Batch rendering ----
+def _slug(teams):
+    return 'all' if teams is None else re.sub(r'[^a-z0-9]+', '-', '_'.join(teams).lower()).strip('-')
+
+
+def season_metrics(year, data_dir=None):
+    """One season's home/away metrics, indexed by team, as the dashboard shows them."""
+    import stats
+    import store
+    import tables
+
+    df_year, _ = store.load_games(data_dir, years=[year])
+    return table_metrics(tables.season_table(stats.metrics_cube(df_year), year))
+
+
+def save_charts(metrics, out_dir, formats=('png',), label=''):
+    """Write every chart of `metrics` into `out_dir` on the Agg backend; returns the file names."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name, fig in charts(plt, metrics, label):
+        for fmt in formats:
+            fig.savefig(os.path.join(out_dir, f'{name}.{fmt}'), dpi=100)
+            written.append(f'{name}.{fmt}')
+        plt.close(fig)
+    return written
+
+
+def render_season(year, subsets, out_dir, formats, data_dir=None):
+    """Render every chart of one season for each team subset; returns the files written."""
+    metrics = season_metrics(year, data_dir)
+    written = []
+    for teams in subsets:
+        sub = metrics if teams is None else metrics.loc[[t for t in teams if t in metrics.index]]
+        if sub.empty:
+            continue
+        target = os.path.join(out_dir, str(year), _slug(teams))
+        written += [os.path.join(target, f) for f in save_charts(sub, target, formats, str(year))]
+    return written
+
+
+def render_all(out_dir, years=None, subsets=(None,), formats=('png',), workers=None, data_dir=None):
+    """Render every season in a process pool (one season per task); returns the files."""
+    import store
+
+    # workers each load their own season; building the store here keeps them from racing to write it
+    store.build_store(data_dir)
+    years = years or store.discover_years(data_dir)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_season, y, list(subsets), out_dir, list(formats), data_dir)
+                   for y in years]
+        return [path for f in futures for path in f.result()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Home/away charts with team logos.")
+    ap.add_argument('--out', help="render every season to this directory instead of showing team_metrics.csv")
+    ap.add_argument('--year', type=int, action='append', help="season to render (repeatable; default: all)")
+    ap.add_argument('--teams', action='append',
+                    help="comma-separated team subset, rendered in addition to all teams (repeatable)")
+    ap.add_argument('--format', action='append', choices=['png', 'svg'], help="output format (default: png)")
+    ap.add_argument('--data-dir', help="directory with cpbl_YYYY.csv (default: CPBL_DATA_DIR or the repo)")
+    ap.add_argument('--workers', type=int, help="process pool size (default: one per core)")
+    args = ap.parse_args(argv)
+
+    if not args.out:
+        import matplotlib.pyplot as plt
+        metrics = pd.read_csv('team_metrics.csv').set_index('home_team')
+        charts(plt, metrics)
+        plt.show()
+        return
+
+    subsets = [None] + [[t.strip() for t in s.split(',')] for s in (args.teams or [])]
+    t0 = time.perf_counter()
+    files = render_all(args.out, args.year, subsets, args.format or ['png'], args.workers, args.data_dir)
+    print(f"🎉 {len(files)} charts → {args.out} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Read-only JSON API for the dashboard's home/away metrics.
+
+Serves the same per-season results the dashboard table is built from (the
+shared metrics cube filtered by `tables.season_results`) to other services:
+
+    GET /api/v1/seasons                        seasons and the data version
+    GET /api/v1/seasons/2024                   every team's Win and Score results
+    GET /api/v1/seasons/2024/teams/Uni-Lions   one team in one season
+    GET /api/v1/teams/Uni-Lions                one team across seasons
+
+Every response body is rendered once per data version, up front, in plain and
+gzip form; a request is a dict lookup and a socket write, with no pandas on
+the request path. ETags are derived from the data version, so clients
+revalidate with If-None-Match and get a bodiless 304 until the CSVs change.
+A background thread polls the data version and swaps in a new payload set.
+Significance is left to the client: records carry the unrounded p-values.
+
+    python api.py --port 8502
+    CPBL_API_POLL_SECONDS=30             how often to check for new data
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import shared_cache
+import store
+import tables
+
+PREFIX = '/api/v1'
+POLL_SECONDS = int(os.environ.get('CPBL_API_POLL_SECONDS', 30))
+
+
+class Payload:
+    """One precomputed response: status, plain and gzip bodies with their ETags."""
+    __slots__ = ('status', 'body', 'gzip', 'etag', 'etag_gzip')
+
+    def __init__(self, obj, version, status=200):
+        self.status = status
+        self.body = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.gzip = gzip.compress(self.body, compresslevel=9, mtime=0)
+        # distinct validators per encoding, both tied to the data version
+        self.etag = f'"{version}"'
+        self.etag_gzip = f'"{version}-gz"'
+
+
+def build_payloads(version, cube):
+    """Every route's Payload for one data version, keyed by decoded path."""
+    years = sorted(int(y) for y in cube.index.get_level_values('year').unique())
+    routes = {}
+    by_team = {}
+    for year in years:
+        records = tables.results_records(tables.season_results(cube, year))
+        routes[f'{PREFIX}/seasons/{year}'] = {'season': year, 'data_version': version, 'teams': records}
+        for rec in records:
+            routes[f'{PREFIX}/seasons/{year}/teams/{rec["team"]}'] = dict(
+                rec, season=year, data_version=version)
+            by_team.setdefault(rec['team'], []).append(dict(rec, season=year))
+    for team, seasons in by_team.items():
+        routes[f'{PREFIX}/teams/{team}'] = {'team': team, 'data_version': version,
+                                            'seasons': [{k: v for k, v in s.items() if k != 'team'}
+                                                        for s in seasons]}
+    routes[f'{PREFIX}/seasons'] = {'data_version': version, 'seasons': years,
+                                   'teams': sorted(by_team)}
+    payloads = {path: Payload(obj, version) for path, obj in routes.items()}
+    payloads[None] = Payload({'error': 'not found', 'routes': [f'{PREFIX}/seasons']}, version, 404)
+    return payloads
+
+
+class MetricsStore:
+    """The current payload set, rebuilt in the background when the data changes."""
+
+    def __init__(self):
+        self.version = None
+        self.payloads = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the payloads if the data version moved; returns True if it did."""
+        with self._lock:
+            version = store.data_version()
+            if version == self.version:
+                return False
+            payloads = build_payloads(version, shared_cache.metrics_cube(version))
+            # one reference swap: in-flight requests keep the set they started with
+            self.payloads, self.version = payloads, version
+            return True
+
+    def poll(self, seconds=POLL_SECONDS):
+        def loop():
+            while True:
+                time.sleep(seconds)
+                try:
+                    if self.refresh():
+                        print(f"🔄 data version {self.version}", flush=True)
+                except Exception as e:   # keep serving the last good payloads
+                    print(f"⚠️ refresh failed: {e}", flush=True)
+        threading.Thread(target=loop, name='api-poll', daemon=True).start()
+
+
+@lru_cache(maxsize=256)
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip (q-values honoured, q=0 refuses)."""
+    q = {}
+    for part in accept_encoding.lower().split(','):
+        coding, *params = [s.strip() for s in part.split(';')]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            q[coding] = weight
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in q:
+            return q[coding] > 0
+    return False
+
+
+def make_handler(metrics, access_log=False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'    # keep-alive
+        # headers and body go out as two writes; without TCP_NODELAY every
+        # keep-alive response waits on the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def version_string(self):
+            return 'cpbl-api'
+
+        def _respond(self, head_only=False):
+            payloads = metrics.payloads
+            path = unquote(self.path.split('?', 1)[0]).rstrip('/')
+            p = payloads.get(path) or payloads[None]
+            gz = accepts_gzip(self.headers.get('Accept-Encoding', ''))
+            body, etag = (p.gzip, p.etag_gzip) if gz else (p.body, p.etag)
+            inm = self.headers.get('If-None-Match')
+            if p.status == 200 and inm and (inm == '*' or p.etag in inm or p.etag_gzip in inm):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Vary', 'Accept-Encoding')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(p.status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Cache-Control', 'no-cache')
+            if p.status == 200:
+                self.send_header('ETag', etag)
+            if gz:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            if not head_only:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._respond()
+
+        def do_HEAD(self):
+            self._respond(head_only=True)
+
+        def log_message(self, fmt, *args):
+            if access_log:
+                super().log_message(fmt, *args)
+
+    return Handler
+
+
+def serve(host='127.0.0.1', port=8502, poll=POLL_SECONDS, access_log=False):
+    t0 = time.perf_counter()
+    metrics = MetricsStore()
+    if poll > 0:
+        metrics.poll(poll)
+    server = ThreadingHTTPServer((host, port), make_handler(metrics, access_log))
+    server.daemon_threads = True
+    print(f"✅ {len(metrics.payloads) - 1} routes for data version {metrics.version} "
+          f"({time.perf_counter() - t0:.1f}s) → http://{host}:{port}{PREFIX}/seasons", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve the home/away metrics as read-only JSON.")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8502)
+    ap.add_argument('--data-dir', help="directory with cpbl_YYYY.csv (default: CPBL_DATA_DIR or the repo)")
+    ap.add_argument('--poll', type=int, default=POLL_SECONDS,
+                    help="seconds between data-version checks (0 disables)")
+    ap.add_argument('--access-log', action='store_true', help="log every request to stderr")
+    args = ap.parse_args(argv)
+    if args.data_dir:
+        store.DATA_DIR = args.data_dir   # the shared cache loads games from store.DATA_DIR
+    serve(args.host, args.port, args.poll, args.access_log)
+
+
+if __name__ == '__main__':
+    main()
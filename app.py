@@ -1,10 +1,13 @@
+import time
+T_START = time.perf_counter()  # on a cold start this includes the imports below
 from datetime import datetime
 import streamlit as st
-import pandas as pd
-import numpy as np
-from scipy.stats import ttest_rel
-import plotly.express as px
-import os, base64, re
+import os
+import drilldown, figures, live, matchups, profiling, shared_cache, store, table_html, tables, timelines
+from game_index import GameIndex
+
+profiling.start_run(t0=T_START)
+profiling.mark('imports')
 
 # ---- set different background color for info function ----
 def info(url):
@@ -42,108 +45,62 @@ th, td {
 """, unsafe_allow_html=True)
 
 # ---- Load raw data dynamically ----
-@st.cache_data
-def load_data():
-    # auto-detect cpbl CSV files in BASE_DIR
-    files = [f for f in os.listdir(BASE_DIR) if re.match(r"cpbl_\d{4}\.csv", f)]
-    years = sorted([int(re.findall(r"cpbl_(\d{4})\.csv", f)[0]) for f in files])
-    frames = []
-    for y in years:
-        path = os.path.join(BASE_DIR, f"cpbl_{y}.csv")
-        df = pd.read_csv(path)
-        df['year'] = y
-        frames.append(df)
-    df_all = pd.concat(frames, ignore_index=True)
-    team_map = {
-        "中信兄弟": "CTBC Brothers",
-        "味全龍": "WeiChuan Dragons",
-        "樂天桃猿": "Rakuten Monkeys",
-        "統一7-ELEVEn獅": "Uni-Lions",
-        "富邦悍將": "Fubon Guardians",
-        "台鋼雄鷹": "TSG Hawks"
-    }
-    df_all['home_team'] = df_all['home_team'].map(team_map)
-    df_all['away_team'] = df_all['away_team'].map(team_map)
-    df_all.dropna(subset=['home_team','away_team'], inplace=True)
-    df_all['home_win'] = (df_all['home_score'] > df_all['away_score']).astype(int)
-    df_all['away_win'] = (df_all['away_score'] > df_all['home_score']).astype(int)
-    return df_all, years
+@profiling.cache_data
+def load_data(version):
+    # typed columnar store compiled from cpbl_YYYY.csv; `version` changes when a CSV does.
+    # A deploy-time `shared_cache.py warm` leaves a pickled snapshot of it to start from.
+    return shared_cache.games(version)
 
 # load data and dynamic years
-df_all, YEARS = load_data()
+with profiling.span('data_version'):
+    DATA_VERSION = store.data_version()
+df_all, YEARS = load_data(DATA_VERSION)
+
+# ---- Per-(year, team) game index: shared read-only, so cached as a resource ----
+@profiling.cache_resource
+def load_index(version):
+    df_all, _ = load_data(version)
+    return GameIndex(df_all)
+
+# ---- Form timelines for every (year, team), one vectorized pass per window size ----
+@profiling.cache_data
+def load_timelines(version, window):
+    return timelines.team_timelines(load_index(version), window)
+
+# ---- Head-to-head grid for every season; any range is a sum over years ----
+@profiling.cache_resource
+def load_matchups(version):
+    df_all, _ = load_data(version)
+    return matchups.Matchups(df_all)
+
+# ---- Strength-adjusted home advantage per target (shared cache; the fit needs scipy) ----
+@profiling.cache_data
+def load_adjusted(version, target):
+    return shared_cache.adjusted_home_advantage(version, target)
 
-# ---- Helper for Cohen's d classification ----
-def d_size(d):
-    if abs(d) < 0.2: return 'negligible'
-    if abs(d) < 0.5: return 'small'
-    if abs(d) < 0.8: return 'medium'
-    return 'large'
+# ---- Precomputed metrics cube: every (year, team, metric), independent of α ----
+# (backed by the on-disk shared cache, so other app processes on the host reuse it)
+@profiling.cache_data
+def load_metrics(version):
+    return shared_cache.metrics_cube(version)
 
-# ---- Compute metrics per year ----
-@st.cache_data
-def compute_metrics(df_year, year, alpha=0.1):
-    recs = []
-    logo_map = {
-        "CTBC Brothers": "ctbc_brothers.png",
-        "WeiChuan Dragons": "weichuan_dragons.png",
-        "Rakuten Monkeys": "rakuten_monkeys.png",
-        "Uni-Lions": "uni_lions.png",
-        "Fubon Guardians": "fubon_guardians.png",
-        "TSG Hawks": "tsg_hawks.png"
-    }
-    for team in sorted(df_year['home_team'].dropna().unique()):
-        # only show Hawks if available year
-        if team == 'TSG Hawks' and year != 2024:
-            continue
-        home = df_year[df_year['home_team'] == team]
-        away = df_year[df_year['away_team'] == team]
-        if len(home) < 2 or len(away) < 2:
-            continue
-        n = min(len(home), len(away))
-        # Win metrics
-        hr = home['home_win'].mean()
-        ar = away['away_win'].mean()
-        wr_diff = hr - ar
-        hw = home['home_win'].values[:n]
-        aw = away['away_win'].values[:n]
-        t_w, p_w = ttest_rel(hw, aw)
-        d_w = np.mean(hw - aw) / np.std(hw - aw, ddof=1)
-        sig_w = '★' if p_w < alpha else ''
-        # Score metrics
-        hs = home['home_score'].mean()
-        as_ = away['away_score'].mean()
-        sc_diff = hs - as_
-        hsc = home['home_score'].values[:n]
-        asc = away['away_score'].values[:n]
-        t_s, p_s = ttest_rel(hsc, asc)
-        d_s = np.mean(hsc - asc) / np.std(hsc - asc, ddof=1)
-        sig_s = '★' if p_s < alpha else ''
-        # Logo URI
-        logo_path = os.path.join(BASE_DIR, 'logos', logo_map.get(team, ''))
-        data_uri = ''
-        if os.path.exists(logo_path):
-            with open(logo_path, 'rb') as f:
-                b64 = base64.b64encode(f.read()).decode()
-            data_uri = f'<img src="data:image/png;base64,{b64}" width="32"/>'
-        recs.append({
-            'Logo': data_uri,
-            'Team': team,
-            'Home Win Rate': round(hr, 3),
-            'Away Win Rate': round(ar, 3),
-            'Win Rate Diff': round(wr_diff, 3),
-            't-stat (Win)': round(t_w, 3),
-            'p-value (Win)': round(p_w, 3),
-            'Cohen d (Win)': d_size(d_w),
-            'Significant (Win)': sig_w,
-            'Home Avg Score': round(hs, 3),
-            'Away Avg Score': round(as_, 3),
-            'Score Diff': round(sc_diff, 3),
-            't-stat (Score)': round(t_s, 3),
-            'p-value (Score)': round(p_s, 3),
-            'Cohen d (Score)': d_size(d_s),
-            'Significant (Score)': sig_s
-        })
-    return pd.DataFrame(recs)
+# ---- Resampling columns (bootstrap CI, permutation p), only built when selected ----
+@profiling.cache_data
+def load_resampled_metrics(version):
+    return load_metrics(version).join(shared_cache.resample_cube(version).drop(columns='diff'))
+
+# ---- Live in-season metrics, shared by every session in this process ----
+@profiling.cache_resource
+def load_live():
+    return live.LiveMetrics(store.DATA_DIR, feed=os.environ.get('CPBL_LIVE_FEED'))
+
+LIVE_POLL_SECONDS = int(os.environ.get('CPBL_LIVE_POLL_SECONDS', 30))
+
+# ---- Display table per year ----
+@profiling.cache_data
+def compute_metrics(version, year, method='t'):
+    cube = load_resampled_metrics(version) if method == 'resample' else load_metrics(version)
+    return tables.season_table(cube, year, method)
 
 # ---- Sidebar Controls ----
 st.sidebar.header("Controls")
@@ -154,6 +111,12 @@ metric = st.sidebar.selectbox(
     help="Choose which metric to analyze"
 )
 alpha = st.sidebar.slider("Significance Level (α)", 0.01, 0.3, 0.1, 0.01)
+test = st.sidebar.radio(
+    "Significance Test",
+    ['Paired t-test', 'Bootstrap / permutation'],
+    help="Bootstrap CIs and permutation p-values treat home and away games as independent samples (10,000 resamples)"
+)
+method = 'resample' if test.startswith('Bootstrap') else 't'
 show_sig = st.sidebar.checkbox("Show only significant teams", False)
 opts = sorted(df_all['home_team'].dropna().unique())
 if year != 2024 and 'TSG Hawks' in opts:
@@ -169,10 +132,26 @@ drill = st.sidebar.selectbox(
     options=[''] + opts,
     help="Pick a team to see detailed data and timelines"
 )
+live_mode = st.sidebar.checkbox(
+    "Live mode ❔", False,
+    help="Follow new games as they are appended to cpbl_YYYY.csv; open sessions refresh automatically"
+)
+if live_mode and method == 'resample':
+    st.sidebar.caption("Live mode uses the paired t-test.")
+    method = 't'
 
 # ---- Compute & Filter ----
-df_y = df_all[df_all['year'] == year]
-mt = compute_metrics(df_y, year, alpha)
+metrics_version = DATA_VERSION
+if live_mode:
+    # running statistics updated from newly appended games only
+    LIVE = load_live()
+    with profiling.span('live_poll'):
+        live_version = LIVE.poll()
+    metrics_version = f"{DATA_VERSION}-live{live_version}"
+    with profiling.span('live_table'):
+        mt = tables.mark_significance(tables.season_table(LIVE.cube(), year), alpha)
+else:
+    mt = tables.mark_significance(compute_metrics(DATA_VERSION, year, method), alpha)
 # Determine lists
 if metric == 'Win Rate':
     sig_list = mt[mt['Significant (Win)'] == '★']['Team'].tolist()
@@ -192,6 +171,17 @@ df_idx = df_disp.set_index('Team')
 st.title("CPBL Seasonal Home/Away Analysis")
 st.write("A data‑driven analysis of CPBL home‑field performance across seasons. We compare home vs. away win rates and scoring, apply paired t‑tests for statistical significance, and quantify effect size with Cohen’s d.")
 st.write(f"Year: {year} • α={alpha}")
+if live_mode:
+    st.session_state['live_version'] = live_version
+
+    @st.fragment(run_every=LIVE_POLL_SECONDS)
+    def live_watch():
+        # cheap poll; a full rerun only when new games have arrived
+        if LIVE.poll() != st.session_state.get('live_version'):
+            st.rerun()
+        st.caption(f"🔴 Live • {LIVE.games} games • checked {datetime.now():%H:%M:%S}")
+
+    live_watch()
 st.subheader("Insights")
 st.info(f":green[**{', '.join(sig_list) if sig_list else 'None'}** have significant differences in {metric_label}, which confirms a real home-field boost.]")
 st.info(f"**{', '.join(non_sig) if non_sig else 'None'}** have no meaningful difference in {metric_label}.")
@@ -199,114 +189,167 @@ st.info(f"**{', '.join(non_sig) if non_sig else 'None'}** have no meaningful dif
 
 # ---- Metrics Table ----
 st.subheader("Metrics Table")
-if metric == 'Win Rate':
-    cols = ['Logo','Team','Home Win Rate','Away Win Rate','Win Rate Diff',
-            't-stat (Win)','p-value (Win)','Cohen d (Win)','Significant (Win)']
-else:
-    cols = ['Logo','Team','Home Avg Score','Away Avg Score','Score Diff',
-            't-stat (Score)','p-value (Score)','Cohen d (Score)','Significant (Score)']
-html = df_disp[cols].to_html(escape=False, index=False)
-html = html.replace('<table ', '<table style="width:100%;border-collapse:collapse;" ')
+cols = tables.columns(metric, method)
+with profiling.span('table_html'):
+    # cached per-row fragments (logos included); only the filtered rows are joined
+    html = table_html.render(df_disp, cols, (metrics_version, year, method))
 st.markdown(f'<div style="width:100%;overflow-x:auto;">{html}</div>', unsafe_allow_html=True)
+profiling.mark('first_paint')  # the table is on screen before any chart library loads
 
 # ---- Charts ----
-if metric == 'Win Rate':
-    st.subheader("Home vs Away Win Rates")
-    st.write("Comparing home and away win rates for each team.")
-    st.plotly_chart(
-        px.bar(
-            df_idx[['Home Win Rate','Away Win Rate']],
-            barmode='group',
-            color_discrete_map={'Home Win Rate':'#0060B0','Away Win Rate':'#05AF7A'}
-        ), use_container_width=True
-    )
-    st.subheader("Win Rate Difference")
-    st.write("Visualizing the difference in win rates between home and away games.")
-    fig = px.bar(
-        x=df_idx['Win Rate Diff'].sort_values(),
-        y=df_idx.index,
-        orientation='h',
-        color_discrete_sequence=['#0060B0']
-    )
-    fig.update_layout(
-    xaxis_title="Win Rate Difference",
-    yaxis_title="Team"
-    )
-    fig.add_vline(x=0, line_dash='dash', line_color='gray')
-    st.plotly_chart(fig, use_container_width=True)
-else:
-    st.subheader("Home vs Away Average Score")
-    st.write("Comparing average scores for home and away games.")
-    st.plotly_chart(
-        px.bar(
-            df_idx[['Home Avg Score','Away Avg Score']],
-            barmode='group',
-            color_discrete_map={'Home Avg Score':'#0060B0','Away Avg Score':'#05AF7A'}
-        ), use_container_width=True
-    )
-    st.subheader("Score Difference")
-    st.write("Visualizing the difference in average scores between home and away games.")
-    fig = px.bar(
-        x=df_idx['Score Diff'].sort_values(),
-        y=df_idx.index,
-        orientation='h',
-        color_discrete_sequence=['#05AF7A']
-    )
-    fig.update_layout(
-    xaxis_title="Score Difference",
-    yaxis_title="Team"
-    )
-    fig.add_vline(x=0, line_dash='dash', line_color='gray')
-    st.plotly_chart(fig, use_container_width=True)
+# figures are cached process-wide by the inputs that shape them
+chart_key = (metrics_version, year, metric, tuple(df_idx.index))
+with profiling.span('charts'):
+    if metric == 'Win Rate':
+        st.subheader("Home vs Away Win Rates")
+        st.write("Comparing home and away win rates for each team.")
+        st.plotly_chart(
+            figures.cached(('group',) + chart_key,
+                           lambda: figures.group_bar(df_idx, ['Home Win Rate','Away Win Rate'])),
+            use_container_width=True
+        )
+        st.subheader("Win Rate Difference")
+        st.write("Visualizing the difference in win rates between home and away games.")
+        st.plotly_chart(
+            figures.cached(('diff',) + chart_key,
+                           lambda: figures.diff_bar(df_idx, 'Win Rate Diff', "Win Rate Difference", '#0060B0')),
+            use_container_width=True
+        )
+    else:
+        st.subheader("Home vs Away Average Score")
+        st.write("Comparing average scores for home and away games.")
+        st.plotly_chart(
+            figures.cached(('group',) + chart_key,
+                           lambda: figures.group_bar(df_idx, ['Home Avg Score','Away Avg Score'])),
+            use_container_width=True
+        )
+        st.subheader("Score Difference")
+        st.write("Visualizing the difference in average scores between home and away games.")
+        st.plotly_chart(
+            figures.cached(('diff',) + chart_key,
+                           lambda: figures.diff_bar(df_idx, 'Score Diff', "Score Difference", '#05AF7A')),
+            use_container_width=True
+        )
 
-# ---- Drill-down ----
-if drill:
-    st.subheader(f"Details for {drill} ({year})")
-    df_raw = df_y[(df_y['home_team']==drill)|(df_y['away_team']==drill)].reset_index(drop=True)
-    st.markdown(
-    "**<p style='font-size:25px;'>Raw game data</p>**",
-    unsafe_allow_html=True,
-)
-    # compute per-game scored by team
-    df_raw['For'] = np.where(
-        df_raw['home_team']==drill,
-        df_raw['home_score'],
-        df_raw['away_score']
-    )
-    # compute summary metrics
-    avg_score = round(df_raw['For'].mean(),3)
-    df_raw['Win'] = np.where(
-        (df_raw['home_team']==drill)&(df_raw['home_score']>df_raw['away_score']) |
-        (df_raw['away_team']==drill)&(df_raw['away_score']>df_raw['home_score']),
-        1, 0
-    )
-    win_rate = round(df_raw['Win'].mean(),3)
-    st.markdown(f"**Average Runs:** {avg_score}  •  **Win Rate:** {win_rate}")
-    st.dataframe(
-        df_raw[['game_id','home_team','away_team','home_score','away_score']],
-        use_container_width=True
-    )
-    # Score Timeline
-    st.subheader("Score Timeline")
-    st.write("Visualizing the score progression for each game involving the selected team.")
-    melt = df_raw.melt(
-        id_vars=['game_id'],
-        value_vars=['home_score','away_score'],
-        var_name='Type',
-        value_name='Score'
-    )
+# ---- Team Form ----
+with profiling.span('form'):
+    st.subheader("Team Form")
+    st.write("Cumulative and rolling form through the season; overlay any number of teams.")
+    form_cols = st.columns([3, 2, 1])
+    form_teams = form_cols[0].multiselect("Teams", options=opts, default=teams)
+    measure = form_cols[1].selectbox("Measure", list(timelines.MEASURES))
+    window = form_cols[2].number_input("Rolling window (games)", 3, 50, 10)
+    if form_teams:
+        col = timelines.MEASURES[measure]
+        st.plotly_chart(
+            figures.cached(('form', DATA_VERSION, year, col, window, tuple(form_teams)),
+                           lambda: figures.form_timeline(
+                               timelines.select(load_timelines(DATA_VERSION, window), year, form_teams),
+                               col, measure, f"{measure} ({year})")),
+            use_container_width=True
+        )
+
+# ---- Strength-Adjusted Home Advantage ----
+with profiling.span('adjusted'):
+    target = 'Win' if metric == 'Win Rate' else 'Score'
+    unit = 'win rate' if target == 'Win' else 'runs per game'
+    st.subheader("Strength-Adjusted Home Advantage")
+    st.write(f"Per-team home advantage ({unit}) from a model fitted on every game of all seasons, "
+             "controlling for each season's opponent strength.")
+    home_adv = load_adjusted(DATA_VERSION, target)
+    adj = home_adv.loc[[t for t in teams if t in home_adv.index]]
+    adj_disp = adj.rename(columns={'home_adv': 'Adjusted Home Adv', 'se': 'Std Error', 'p': 'p-value',
+                                   'home_games': 'Home Games'})
+    adj_disp = adj_disp[['Home Games', 'Adjusted Home Adv', 'Std Error', 'p-value']].round(3)
+    adj_disp.index.name = 'Team'
+    adj_disp['Significant'] = (adj['p'] < alpha).map({True: '★', False: ''})
     st.plotly_chart(
-        px.line(melt, x='game_id', y='Score', color='Type', title=f"{drill} Score Timeline ({year})"),
+        figures.cached(('adjusted', DATA_VERSION, target, tuple(adj.index)),
+                       lambda: figures.diff_bar(adj_disp, 'Adjusted Home Adv',
+                                                f"Adjusted Home Advantage ({unit})",
+                                                '#0060B0' if target == 'Win' else '#05AF7A')),
         use_container_width=True
     )
-    # Win Rate Timeline
-    st.subheader("Win Rate Timeline")
-    st.write("Visualizing the cumulative win rate over the season for the selected team.")
-    df_raw['Cume Win Rate'] = df_raw['Win'].expanding().mean()
+    st.dataframe(adj_disp, use_container_width=True)
+
+# ---- Head-to-Head ----
+# colour midpoint and cell text format per value
+H2H_STYLE = {'win_rate': (0.5, '.2f'), 'games': (None, '.0f'), 'run_diff': (0, '.0f'), 'home_adv': (0, '.2f')}
+with profiling.span('head_to_head'):
+    st.subheader("Head-to-Head")
+    st.write("Each row team's record against each column opponent over the chosen seasons.")
+    h2h_cols = st.columns([3, 2])
+    if len(YEARS) > 1:
+        h2h_years = h2h_cols[0].select_slider("Seasons", options=YEARS, value=(YEARS[0], YEARS[-1]))
+    else:
+        h2h_years = (YEARS[0], YEARS[0])
+    h2h_measure = h2h_cols[1].selectbox("Value", list(matchups.MEASURES))
+    h2h_col = matchups.MEASURES[h2h_measure]
+    span_label = f"{h2h_years[0]}" if h2h_years[0] == h2h_years[1] else f"{h2h_years[0]}–{h2h_years[1]}"
     st.plotly_chart(
-        px.line(df_raw, x='game_id', y='Cume Win Rate', title=f"{drill} Cumulative Win Rate ({year})"),
+        figures.cached(('h2h', DATA_VERSION, h2h_years, h2h_col),
+                       lambda: figures.h2h_heatmap(load_matchups(DATA_VERSION).matrix(h2h_col, h2h_years),
+                                                   h2h_measure, f"{h2h_measure} ({span_label})",
+                                                   *H2H_STYLE[h2h_col])),
         use_container_width=True
     )
+
+# ---- Drill-down ----
+# any range of seasons; only the visible page of games is materialized and
+# timelines are capped at TIMELINE_POINTS per series
+TIMELINE_POINTS = int(os.environ.get('CPBL_TIMELINE_POINTS', 500))
+with profiling.span('drilldown'):
+    if drill:
+        if len(YEARS) > 1:
+            drill_range = st.select_slider("Drill-down seasons", options=YEARS, value=(year, year))
+        else:
+            drill_range = (year, year)
+        drill_years = tuple(y for y in YEARS if drill_range[0] <= y <= drill_range[1])
+        span_label = str(drill_range[0]) if len(drill_years) == 1 else f"{drill_range[0]}–{drill_range[1]}"
+        st.subheader(f"Details for {drill} ({span_label})")
+        index = load_index(DATA_VERSION)
+        season = drilldown.team_slice(index, drill_years, drill)
+        st.markdown(
+        "**<p style='font-size:25px;'>Raw game data</p>**",
+        unsafe_allow_html=True,
+    )
+        # compute summary metrics
+        avg_score = round(season['runs_for'].mean(),3)
+        win_rate = round(season['win'].mean(),3)
+        st.markdown(f"**Average Runs:** {avg_score}  •  **Win Rate:** {win_rate}")
+        page_cols = st.columns([2, 1, 1, 1])
+        sort_by = page_cols[0].selectbox("Sort by", list(drilldown.SORT_KEYS))
+        descending = page_cols[1].checkbox("Descending", False)
+        page_size = page_cols[2].selectbox("Rows per page", [25, 50, 100])
+        n_pages = max(1, -(-len(season) // page_size))
+        page = page_cols[3].number_input(f"Page (of {n_pages})", 1, n_pages, 1)
+        page_df, n_games = drilldown.games_page(df_all, index, drill_years, drill, sort_by, descending,
+                                                page - 1, page_size)
+        st.dataframe(page_df, use_container_width=True)
+        st.caption(f"Games {(page - 1) * page_size + 1}–{(page - 1) * page_size + len(page_df)} of {n_games}")
+        # the team's games are only built when a timeline figure is not cached yet
+        team_games = lambda: drilldown.team_games(df_all, index, drill_years, drill)
+        # Score Timeline
+        st.subheader("Score Timeline")
+        st.write("Visualizing the score progression for each game involving the selected team.")
+        st.plotly_chart(
+            figures.cached(('score_timeline', DATA_VERSION, drill_years, drill, TIMELINE_POINTS),
+                           lambda: figures.score_timeline(
+                               drilldown.downsample(drilldown.score_timeline(team_games()), 'Game', 'Score',
+                                                    TIMELINE_POINTS, by='Type'),
+                               f"{drill} Score Timeline ({span_label})")),
+            use_container_width=True
+        )
+        # Win Rate Timeline
+        st.subheader("Win Rate Timeline")
+        st.write("Visualizing the cumulative win rate over the selected seasons for the selected team.")
+        st.plotly_chart(
+            figures.cached(('win_rate_timeline', DATA_VERSION, drill_years, drill, TIMELINE_POINTS),
+                           lambda: figures.win_rate_timeline(
+                               drilldown.downsample(team_games(), 'Game', 'Cume Win Rate', TIMELINE_POINTS),
+                               f"{drill} Cumulative Win Rate ({span_label})")),
+            use_container_width=True
+        )
 # ---- Legend & Cohen's d info ----
 st.markdown("---")
 st.markdown("★ indicates p < selected α  |  Cohen's d effect sizes: negligible (<0.2), small (0.2–0.5), medium (0.5–0.8), large (>0.8)")
@@ -329,4 +372,9 @@ with st.sidebar:
         **Author:** Sara Liu  
         **Contact:** saraliu302@gmail.com  
         """
-    )
\ No newline at end of file
+    )
+
+# ---- Profiling: close this rerun's record; hidden panel via ?debug=1 ----
+profiling.end_run()
+if st.query_params.get('debug') == '1':
+    profiling.render_panel(st)
@@ -0,0 +1,149 @@
+"""Raw box-page archive and offline re-parsing.
+
+Every page `ingest.crawl` fetches (box HTML or a live-API JSON document) can
+be kept here so new fields or a fixed selector never require re-scraping the
+site. Pages are stored gzip-compressed
+and content-addressed (objects/ab/<sha256>.html.gz, so identical pages such
+as "no game" placeholders are stored once); an append-only index.jsonl maps
+each (year, game_id) to the hash of its latest page.
+
+Re-parsing runs offline in a process pool across cores, either to rebuild
+cpbl_YYYY.csv or to produce a richer box-score table (venue, line score,
+R/H/E):
+
+    python requestdata.py --year 2025 --archive archive/      # fetch and archive
+    python archive.py archive/ --year 2025 --csv .            # rebuild cpbl_2025.csv
+    python archive.py archive/ --detail boxscores.csv         # every archived season
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ingest
+
+
+class Archive:
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.jsonl')
+        self._lock = threading.Lock()
+        self._latest = {}     # (year, game_id) -> index record
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted crawl
+                    self._latest[(int(rec['year']), rec['game_id'])] = rec
+
+    def object_path(self, sha):
+        return os.path.join(self.root, 'objects', sha[:2], f"{sha}.html.gz")
+
+    def put(self, year, game_id, html):
+        """Store one fetched page; returns its sha256."""
+        raw = html.encode('utf-8')
+        sha = hashlib.sha256(raw).hexdigest()
+        path = self.object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with gzip.open(tmp, 'wb', compresslevel=6) as f:
+                f.write(raw)
+            os.replace(tmp, path)
+        rec = {'year': int(year), 'game_id': game_id, 'sha256': sha,
+               'bytes': len(raw), 'fetched': round(time.time(), 3)}
+        with self._lock:
+            self._latest[(int(year), game_id)] = rec
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(rec) + '\n')
+        return sha
+
+    def get(self, year, game_id):
+        """Latest archived page for the game, or None."""
+        rec = self._latest.get((int(year), game_id))
+        return read_page(self.object_path(rec['sha256'])) if rec else None
+
+    def entries(self, years=None):
+        """Latest (year, game_id, object path) per game, ordered by year and game."""
+        keys = sorted(k for k in self._latest if years is None or k[0] in years)
+        return [(y, g, self.object_path(self._latest[(y, g)]['sha256'])) for y, g in keys]
+
+    def years(self):
+        return sorted({y for y, _ in self._latest})
+
+
+def read_page(path):
+    with gzip.open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+# ---- Offline re-parsing ----
+def _parse_entry(entry, detail=False):
+    year, game_id, path = entry
+    parse = ingest.parse_box_detail if detail else ingest.parse_box
+    row = parse(read_page(path), game_id)
+    return dict(row, year=year) if row else None
+
+
+def _parse_batch(batch, detail):
+    return [_parse_entry(e, detail) for e in batch]
+
+
+def reparse(archive, years=None, detail=False, workers=None, batch=64):
+    """Parse archived pages in parallel; returns a frame of the rows found.
+
+    Pages without a scoreboard (postponed games, placeholders) are skipped.
+    """
+    import pandas as pd
+
+    entries = archive.entries(years)
+    batches = [entries[i:i + batch] for i in range(0, len(entries), batch)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = [r for part in pool.map(_parse_batch, batches, [detail] * len(batches))
+                for r in part if r]
+    return pd.DataFrame(rows)
+
+
+def rebuild_csv(archive, year, data_dir='.', workers=None):
+    """Rewrite cpbl_YYYY.csv from the archive alone; returns the number of games."""
+    df = reparse(archive, [year], workers=workers)
+    if df.empty:
+        return 0
+    df = df[['game_id', 'away_team', 'home_team', 'away_score', 'home_score']]
+    ingest.write_csv_atomic(df.sort_values('game_id', key=lambda s: s.astype(int)),
+                            ingest.season_path(year, data_dir))
+    return len(df)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Re-parse archived CPBL box pages offline.")
+    ap.add_argument('root', help="archive directory (as passed to requestdata.py --archive)")
+    ap.add_argument('--year', type=int, action='append', help="season to parse (repeatable; default: all)")
+    ap.add_argument('--csv', metavar='DATA_DIR', help="rebuild cpbl_YYYY.csv for each season into DATA_DIR")
+    ap.add_argument('--detail', metavar='OUT', help="write venue, line score and R/H/E for every game to OUT")
+    ap.add_argument('--workers', type=int, help="process pool size (default: one per core)")
+    args = ap.parse_args(argv)
+
+    archive = Archive(args.root)
+    years = args.year or archive.years()
+    t0 = time.perf_counter()
+    if args.csv:
+        for y in years:
+            n = rebuild_csv(archive, y, args.csv, args.workers)
+            print(f"✅ cpbl_{y}.csv: {n} 場")
+    if args.detail:
+        df = reparse(archive, years, detail=True, workers=args.workers)
+        ingest.write_csv_atomic(df, args.detail)
+        print(f"✅ {args.detail}: {len(df)} 場")
+    print(f"🎉 {len(archive.entries(years))} pages in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""Headless benchmarks for the data and stats pipeline.
+
+Generates a synthetic league in the cpbl_YYYY.csv schema, times each pipeline
+stage without Streamlit and appends one JSON line per stage to a results file,
+tagged with the git revision, so runs can be compared across versions:
+
+    python benchmark.py --preset today
+    python benchmark.py --preset decades --compare bench_results.jsonl
+"""
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import drilldown
+import matchups
+import ratings
+import resampling
+import stats
+import store
+import timelines
+from game_index import GameIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PRESETS = {
+    'today':   dict(seasons=3, teams=6, games=300),
+    'decades': dict(seasons=30, teams=6, games=300),
+    'minor':   dict(seasons=5, teams=30, games=2400),
+}
+
+
+def app_imports(path=os.path.join(BASE_DIR, 'app.py')):
+    """app.py's top-level imports (what it loads before the first render) as one script."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body
+                     if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# ---- Synthetic data ----
+def synthetic_team_map(teams):
+    """Raw -> display names; the first six are the real CPBL clubs."""
+    real = list(store.TEAM_MAP.items())
+    extra = [(f"隊伍{i:02d}", f"Team {i:02d}") for i in range(len(real) + 1, teams + 1)]
+    return dict((real + extra)[:teams])
+
+
+def synthetic_league(out_dir, seasons=3, teams=6, games=300, start_year=2022, seed=0):
+    """Write cpbl_YYYY.csv files with a mild home advantage; returns the team map."""
+    team_map = synthetic_team_map(teams)
+    names = np.array(list(team_map))
+    rng = np.random.default_rng(seed)
+    width = max(3, len(str(games)))
+    for k in range(seasons):
+        strength = rng.normal(4.0, 0.4, teams)
+        home = rng.integers(0, teams, games)
+        away = (home + rng.integers(1, teams, games)) % teams
+        home_score = rng.poisson(strength[home] + 0.2)
+        away_score = rng.poisson(strength[away])
+        ties = home_score == away_score
+        home_score[ties] += rng.integers(0, 2, ties.sum())
+        pd.DataFrame({
+            'game_id': [str(i).zfill(width) for i in range(1, games + 1)],
+            'away_team': names[away],
+            'home_team': names[home],
+            'away_score': away_score,
+            'home_score': home_score,
+        }).to_csv(os.path.join(out_dir, f"cpbl_{start_year + k}.csv"), index=False, encoding='utf-8-sig')
+    return team_map
+
+
+# ---- Pipeline stages ----
+def _load_team_metrics():
+    # the aggregation script's file name isn't importable by name
+    spec = importlib.util.spec_from_file_location(
+        'data_cleaning', os.path.join(BASE_DIR, 'DataCleaning&Calculation.py'))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.team_metrics
+
+
+def csv_load(data_dir, team_map):
+    # the pre-store load path: parse every CSV and map names on each call
+    frames = []
+    for y in store.discover_years(data_dir):
+        df = pd.read_csv(os.path.join(data_dir, f"cpbl_{y}.csv"))
+        df['year'] = y
+        frames.append(df)
+    df_all = pd.concat(frames, ignore_index=True)
+    df_all['home_team'] = df_all['home_team'].map(team_map)
+    df_all['away_team'] = df_all['away_team'].map(team_map)
+    df_all.dropna(subset=['home_team', 'away_team'], inplace=True)
+    df_all['home_win'] = (df_all['home_score'] > df_all['away_score']).astype(int)
+    df_all['away_win'] = (df_all['away_score'] > df_all['home_score']).astype(int)
+    return df_all
+
+
+def stages(data_dir, team_map):
+    """(name, setup, fn) triples; setup runs untimed before each repeat."""
+    sdir = store.store_dir(data_dir)
+    team_metrics = _load_team_metrics()
+    df_all, years = store.load_games(data_dir, team_map=team_map)
+    index = GameIndex(df_all)
+    last = df_all[df_all['year'] == years[-1]]
+    teams = sorted(last['home_team'].dropna().unique())
+
+    def wipe_store():
+        for f in os.listdir(sdir):
+            os.unlink(os.path.join(sdir, f))
+
+    def all_drilldowns():
+        for t in teams:
+            drilldown.score_timeline(drilldown.team_games(df_all, index, years[-1], t))
+
+    def all_drilldown_pages():
+        for t in teams:
+            drilldown.games_page(df_all, index, years[-1], t, 'Runs for', True, 1, 25)
+
+    def all_history_timelines():
+        # every season at once, downsampled to the app's default point cap
+        for t in teams:
+            games = drilldown.team_games(df_all, index, years, t)
+            drilldown.downsample(drilldown.score_timeline(games), 'Game', 'Score', 500, by='Type')
+            drilldown.downsample(games, 'Game', 'Cume Win Rate', 500)
+
+    imports = app_imports()
+
+    def cold_import():
+        subprocess.run([sys.executable, '-c', imports], cwd=BASE_DIR, check=True)
+
+    return [
+        ('cold_import', None, cold_import),
+        ('csv_load', None, lambda: csv_load(data_dir, team_map)),
+        ('store_build', wipe_store, lambda: store.build_store(data_dir, team_map=team_map)),
+        ('store_load', None, lambda: store.load_games(data_dir, team_map=team_map)),
+        ('metrics_cube', None, lambda: stats.metrics_cube(df_all)),
+        ('resample_cube_10k', None, lambda: resampling.resample_cube(df_all, 10_000)),
+        ('team_aggregation', None, lambda: team_metrics(df_all)),
+        ('game_index', None, lambda: GameIndex(df_all)),
+        ('team_timelines', None, lambda: timelines.team_timelines(index, 10)),
+        ('head_to_head', None, lambda: matchups.Matchups(df_all).table()),
+        ('adjusted_model_fit', None, lambda: ratings.HomeAdvantageModel('Score').fit(df_all)),
+        ('drilldown_all_teams', None, all_drilldowns),
+        ('drilldown_pages_all_teams', None, all_drilldown_pages),
+        ('drilldown_history_all_teams', None, all_history_timelines),
+    ], len(df_all)
+
+
+def time_stage(setup, fn, repeat):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def git_rev():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(seasons, teams, games, repeat=5, seed=0, only=None, label=None):
+    config = dict(seasons=seasons, teams=teams, games=games, seed=seed)
+    env = dict(rev=git_rev(), label=label, python=platform.python_version(),
+               numpy=np.__version__, pandas=pd.__version__, machine=platform.machine())
+    records = []
+    with tempfile.TemporaryDirectory(prefix='cpbl_bench_') as data_dir:
+        team_map = synthetic_league(data_dir, seasons, teams, games, seed=seed)
+        stage_list, n_rows = stages(data_dir, team_map)
+        for name, setup, fn in stage_list:
+            if only and name not in only:
+                continue
+            fn()  # warm-up
+            times = time_stage(setup, fn, repeat)
+            records.append(dict(env, ts=time.time(), stage=name, config=config, rows=n_rows,
+                                repeat=repeat, best_ms=round(min(times), 3),
+                                median_ms=round(statistics.median(times), 3)))
+    return records
+
+
+def previous(path, config):
+    """Most recent earlier result per stage for the same config."""
+    prev = {}
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec.get('config') == config:
+                    prev[rec['stage']] = rec
+    return prev
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the CPBL data/stats pipeline on synthetic data.")
+    ap.add_argument('--preset', choices=sorted(PRESETS))
+    ap.add_argument('--seasons', type=int)
+    ap.add_argument('--teams', type=int)
+    ap.add_argument('--games', type=int, help="games per season")
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--stage', action='append', help="only run this stage (repeatable)")
+    ap.add_argument('--label', help="free-form tag stored with the results")
+    ap.add_argument('--out', default='bench_results.jsonl', help="JSON-lines file to append results to")
+    ap.add_argument('--compare', help="results file to compare against (default: --out)")
+    args = ap.parse_args(argv)
+
+    cfg = dict(PRESETS[args.preset or 'today'])
+    for k in ('seasons', 'teams', 'games'):
+        if getattr(args, k):
+            cfg[k] = getattr(args, k)
+    records = run(repeat=args.repeat, seed=args.seed, only=args.stage, label=args.label, **cfg)
+    prev = previous(args.compare or args.out, dict(cfg, seed=args.seed))
+
+    print(f"{cfg['seasons']} seasons × {cfg['teams']} teams × {cfg['games']} games "
+          f"({records[0]['rows'] if records else 0} rows), best of {args.repeat}")
+    for r in records:
+        line = f"  {r['stage']:<22}{r['best_ms']:>10.2f} ms  (median {r['median_ms']:.2f})"
+        if r['stage'] in prev:
+            ratio = r['best_ms'] / prev[r['stage']]['best_ms']
+            line += f"  ×{ratio:.2f} vs {prev[r['stage']]['rev']}"
+        print(line)
+    with open(args.out, 'a', encoding='utf-8') as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Per-team drill-down frames shared by the dashboard and the benchmarks.
+
+`years` is one season or a range of seasons; several seasons are laid end to
+end in season order and numbered by the team's running game count ('Game').
+"""
+import numpy as np
+import pandas as pd
+
+
+def team_slice(index, years, team):
+    """The game index rows of `team` in one season (int) or several (iterable)."""
+    if isinstance(years, (int, np.integer)):
+        return index.team_season(int(years), team)
+    return index.team_seasons(years, team)
+
+
+def team_games(df_all, index, years, team):
+    """The team's games with Game, For, Win and Cume Win Rate columns.
+
+    Rows come straight from the game index's (year, team) slices, so no
+    column of the full frame is scanned.
+    """
+    sl = team_slice(index, years, team)
+    df_raw = df_all.take(sl['row'].to_numpy()).reset_index(drop=True)
+    df_raw['Game'] = np.arange(1, len(df_raw) + 1)
+    # per-game runs scored by the team and win flag, precomputed in the index
+    df_raw['For'] = sl['runs_for'].to_numpy()
+    df_raw['Win'] = sl['win'].to_numpy()
+    df_raw['Cume Win Rate'] = df_raw['Win'].expanding().mean()
+    return df_raw
+
+
+def score_timeline(df_raw):
+    """Long-format home/away scores per game for the score timeline chart."""
+    return df_raw.melt(
+        id_vars=['Game', 'year', 'game_id'],
+        value_vars=['home_score', 'away_score'],
+        var_name='Type',
+        value_name='Score'
+    )
+
+
+# ---- Windowed view for long histories ----
+# sortable columns of the game index, by display label ('Game': season, then game order)
+SORT_KEYS = {
+    'Game': None,
+    'Opponent': 'opponent',
+    'Home/Away': 'is_home',
+    'Runs for': 'runs_for',
+    'Runs against': 'runs_against',
+    'Result': 'win',
+}
+PAGE_COLUMNS = ['year', 'game_id', 'home_team', 'away_team', 'home_score', 'away_score']
+
+
+def games_page(df_all, index, years, team, sort='Game', descending=False, page=0, page_size=25):
+    """One page of the team's games, sorted server-side; returns (frame, total games).
+
+    The sort runs over the index slice's own columns (ties stay in season
+    and game order), and only the rows of the requested page are taken from
+    `df_all`.
+    """
+    sl = team_slice(index, years, team)
+    col = SORT_KEYS[sort]
+    if col is None:
+        key = np.arange(len(sl))
+    else:
+        key = sl[col]
+        key = (key.cat.codes if isinstance(key.dtype, pd.CategoricalDtype) else key).to_numpy(np.int64)
+    order = np.argsort(-key if descending else key, kind='stable')
+    start = page * page_size
+    rows = sl['row'].to_numpy()[order[start:start + page_size]]
+    return df_all.take(rows)[PAGE_COLUMNS].reset_index(drop=True), len(sl)
+
+
+def lttb(x, y, n_out):
+    """Indices of `n_out` points chosen by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, per bucket, the point forming the
+    largest triangle with the previous pick and the next bucket's mean, so
+    peaks and turns survive the downsampling.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt = slice(edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(df, x, y, max_points, by=None):
+    """At most `max_points` rows per `by` group (all rows if under the cap), via LTTB."""
+    if by is None:
+        if len(df) <= max_points:
+            return df
+        return df.iloc[lttb(df[x].to_numpy(), df[y].to_numpy(), max_points)]
+    return pd.concat([downsample(g, x, y, max_points) for _, g in df.groupby(by, sort=False)])
@@ -0,0 +1,71 @@
+"""Dashboard chart builders plus a process-wide LRU cache of their JSON.
+
+Charts are keyed by the inputs that actually change them (data version, year,
+metric, the teams shown, the drill-down team). A hit hands Streamlit the
+stored figure JSON without touching pandas or plotly.express again; the cache
+is shared by every session in the process.
+"""
+import json
+import os
+
+import profiling
+
+FIGURES = profiling.LRUCache('figures', int(os.environ.get('CPBL_FIGURE_CACHE_SIZE', 256)))
+
+
+def cached(key, build):
+    """Figure dict for `key`, calling `build()` -> plotly Figure only on a miss."""
+    return json.loads(FIGURES.get_or_build(key, lambda: build().to_json()))
+
+
+# ---- Builders ----
+# plotly.express is imported on the first cache miss, not at app start
+def _px():
+    import plotly.express as px
+    return px
+
+
+def group_bar(df_idx, cols):
+    return _px().bar(
+        df_idx[cols],
+        barmode='group',
+        color_discrete_map={cols[0]: '#0060B0', cols[1]: '#05AF7A'}
+    )
+
+
+def diff_bar(df_idx, col, title, color):
+    diff = df_idx[col].sort_values()
+    fig = _px().bar(
+        x=diff.to_numpy(),
+        y=diff.index,
+        orientation='h',
+        color_discrete_sequence=[color]
+    )
+    fig.update_layout(
+        xaxis_title=title,
+        yaxis_title="Team"
+    )
+    fig.add_vline(x=0, line_dash='dash', line_color='gray')
+    return fig
+
+
+def score_timeline(melt, title):
+    return _px().line(melt, x='Game', y='Score', color='Type', title=title,
+                      hover_data=['year', 'game_id'])
+
+
+def win_rate_timeline(df_raw, title):
+    return _px().line(df_raw, x='Game', y='Cume Win Rate', title=title,
+                      hover_data=['year', 'game_id'])
+
+
+def form_timeline(tl, col, label, title):
+    return _px().line(tl, x='game', y=col, color='team', title=title,
+                      labels={'game': 'Game', col: label, 'team': 'Team'},
+                      hover_data=['game_id', 'opponent'])
+
+
+def h2h_heatmap(mat, label, title, midpoint=None, fmt='.2f'):
+    return _px().imshow(mat, text_auto=fmt,
+                        aspect='auto', color_continuous_scale='RdBu', color_continuous_midpoint=midpoint,
+                        labels={'x': 'Opponent', 'y': 'Team', 'color': label}, title=title)
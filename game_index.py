@@ -0,0 +1,63 @@
+"""Team-indexed view of the loaded games.
+
+Every game appears twice, once from each team's perspective, sorted by
+(year, team, game order), with runs for/against, win and home flags already
+derived. A (year, team) lookup table of row ranges makes any team's season a
+contiguous slice instead of a boolean scan over the full frame.
+"""
+import numpy as np
+import pandas as pd
+
+
+class GameIndex:
+    def __init__(self, df_all):
+        n = len(df_all)
+        home = df_all['home_team'].astype(str).to_numpy()
+        away = df_all['away_team'].astype(str).to_numpy()
+        hs = df_all['home_score'].to_numpy()
+        as_ = df_all['away_score'].to_numpy()
+        year = np.tile(df_all['year'].to_numpy(), 2)
+        team = np.concatenate([home, away])
+        self.teams = sorted(set(team))
+        code = pd.Categorical(team, categories=self.teams).codes
+        # tie-break on the original row so each team's games stay in game order
+        row = np.tile(np.arange(n), 2)
+        order = np.lexsort((row, code, year))
+        is_home = np.r_[np.ones(n, np.int8), np.zeros(n, np.int8)]
+        runs_for = np.concatenate([hs, as_])
+        runs_against = np.concatenate([as_, hs])
+        self.frame = pd.DataFrame({
+            'year': year[order],
+            'team': pd.Categorical.from_codes(code[order], self.teams),
+            'opponent': pd.Categorical(np.concatenate([away, home])[order], categories=self.teams),
+            'game_id': np.tile(df_all['game_id'].to_numpy(), 2)[order],
+            'is_home': is_home[order],
+            'runs_for': runs_for[order],
+            'runs_against': runs_against[order],
+            'win': (runs_for > runs_against).astype(np.int8)[order],
+            'row': row[order],   # position in df_all
+        })
+        # (year, team) -> [start, stop) over the sorted frame
+        y, c = year[order], code[order]
+        bounds = np.flatnonzero(np.r_[True, (y[1:] != y[:-1]) | (c[1:] != c[:-1]), True])
+        self.offsets = {
+            (int(y[a]), self.teams[c[a]]): (int(a), int(b))
+            for a, b in zip(bounds[:-1], bounds[1:])
+        }
+
+    def team_season(self, year, team):
+        """Team-perspective rows for one season (a slice, not a filtered copy)."""
+        a, b = self.offsets.get((year, team), (0, 0))
+        return self.frame.iloc[a:b]
+
+    def team_seasons(self, years, team):
+        """Team-perspective rows for several seasons, in season then game order."""
+        spans = [self.offsets[(y, team)] for y in sorted(years) if (y, team) in self.offsets]
+        if len(spans) <= 1:
+            a, b = spans[0] if spans else (0, 0)
+            return self.frame.iloc[a:b]
+        return self.frame.iloc[np.concatenate([np.arange(a, b) for a, b in spans])]
+
+    def rows(self, year, team):
+        """Positions of the team's games in the original frame, in game order."""
+        return self.team_season(year, team)['row'].to_numpy()
@@ -0,0 +1,572 @@
+"""Concurrent, resumable CPBL box-score ingestion.
+
+A bounded pool of worker threads fetches box pages through a pluggable
+transport, respecting a per-host rate limit and retrying with exponential
+backoff. The default transport reads cpbl.com.tw's live-box API: the box page
+itself carries no scores (the site's Vue app POSTs the page form to
+/box/getlive and renders the JSON), so the transport does the same and hands
+back that JSON. Plain HTTP works against saved, already rendered pages, and a
+headless browser renders the page as a user would. Games with a final score
+are appended to a JSON-lines checkpoint so an interrupted crawl resumes where
+it stopped; games without one are fetched again on the next run.
+"""
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from http.cookiejar import CookieJar
+from urllib.parse import parse_qs, urlencode, urljoin, urlparse
+from urllib.request import HTTPCookieProcessor, Request, build_opener, urlopen
+
+BOX_URL = "https://www.cpbl.com.tw/box?year={year}&KindCode={kind}&gameSno={game_id}"
+LIVE_PATH = "/box/getlive"
+USER_AGENT = "Mozilla/5.0 (cpbl-dashboard ingest)"
+
+
+class FetchError(Exception):
+    """Raised when a box page cannot be fetched after all retries."""
+
+
+# ---- Box page parsing ----
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+              'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+
+class _ScoreBoardParser(HTMLParser):
+    # walks the rendered DOM and collects team names/scores under .item.ScoreBoard
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.fields = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        classes = set((dict(attrs).get('class') or '').split())
+        self.stack.append((tag, classes))
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        # pop up to the matching open tag so stray end tags don't derail the stack
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                return
+
+    def _side(self):
+        in_board = False
+        side = None
+        for tag, classes in self.stack:
+            if {'item', 'ScoreBoard'} <= classes:
+                in_board = True
+            elif in_board and 'team' in classes and tag == 'div':
+                side = 'away' if 'away' in classes else 'home' if 'home' in classes else None
+        return side
+
+    def handle_data(self, data):
+        text = data.strip()
+        if not text or not self.stack:
+            return
+        side = self._side()
+        if side is None:
+            return
+        tag, classes = self.stack[-1]
+        parent = self.stack[-2][1] if len(self.stack) > 1 else set()
+        if tag == 'a' and 'team_name' in parent:
+            self.fields.setdefault(f'{side}_team', text)
+        elif 'score' in classes:
+            self.fields.setdefault(f'{side}_score', text)
+
+
+def _scoreboard_row(f, game_id):
+    try:
+        return {
+            "game_id":    game_id,
+            "away_team":  f['away_team'],
+            "home_team":  f['home_team'],
+            "away_score": int(f['away_score']),
+            "home_score": int(f['home_score'])
+        }
+    except (KeyError, ValueError):
+        return None
+
+
+def parse_box_html(html, game_id):
+    """Extract the scoreboard row from a rendered box page, or None if absent."""
+    parser = _ScoreBoardParser()
+    parser.feed(html)
+    return _scoreboard_row(parser.fields, game_id)
+
+
+def parse_box(page, game_id):
+    """Scoreboard row from whatever a transport returned (live JSON or HTML)."""
+    if page.lstrip().startswith('{'):
+        return parse_live_json(page, game_id)
+    return parse_box_html(page, game_id)
+
+
+class _BoxDetailParser(_ScoreBoardParser):
+    # additionally collects the venue, per-inning runs and the R/H/E block
+    def __init__(self):
+        super().__init__()
+        self.venue = None
+        self.innings = {'away': [], 'home': []}
+        self.rhe = {'away': [], 'home': []}
+
+    def _within(self, *names):
+        return any(set(names) <= classes for _, classes in self.stack)
+
+    def handle_data(self, data):
+        super().handle_data(data)
+        text = data.strip()
+        if not text or not self._within('item', 'ScoreBoard'):
+            return
+        tag, classes = self.stack[-1]
+        row = next((c for t, c in reversed(self.stack) if t == 'tr'), set())
+        side = 'away' if 'away' in row else 'home' if 'home' in row else None
+        if 'place' in classes:
+            self.venue = self.venue or text
+        elif side and 'card' in classes and self._within('linescore', 'scrollable'):
+            self.innings[side].append(text)
+        elif side and tag == 'td' and self._within('linescore', 'fixed'):
+            self.rhe[side].append(text)
+
+
+def parse_box_detail(html, game_id):
+    """Scoreboard row plus venue, line score and R/H/E, or None if absent.
+
+    Innings are kept as strings ('X' for an unplayed bottom half); R/H/E are
+    None when the page has no line score. Live-API documents are accepted too.
+    """
+    if html.lstrip().startswith('{'):
+        return parse_live_json(html, game_id, detail=True)
+    parser = _BoxDetailParser()
+    parser.feed(html)
+    row = _scoreboard_row(parser.fields, game_id)
+    if row is None:
+        return None
+    row['venue'] = parser.venue
+    for side in ('away', 'home'):
+        rhe = parser.rhe[side]
+        for k, name in enumerate('rhe'):
+            row[f'{side}_{name}'] = int(rhe[k]) if len(rhe) > k and rhe[k].isdigit() else None
+        row[f'{side}_innings'] = ' '.join(parser.innings[side])
+    return row
+
+
+# ---- Live box API (what the site's own page calls) ----
+class _BoxFormParser(HTMLParser):
+    # hidden inputs of form#MainForm (anti-forgery token, GameSno, KindCode, Year)
+    # and the "YYYY/MM/DD AWAY VS. HOME" breadcrumb
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.in_form = False
+        self.fields = {}
+        self.teams = None
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == 'form':
+            self.in_form = a.get('id') == 'MainForm'
+        elif tag == 'input' and self.in_form and a.get('type') == 'hidden' and a.get('name'):
+            self.fields[a['name']] = a.get('value') or ''
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self.in_form = False
+
+    def handle_data(self, data):
+        m = re.match(r'\d{4}/\d{2}/\d{2}\s+(.+?)\s+VS\.\s+(.+)$', data.strip())
+        if m and self.teams is None:
+            self.teams = [m.group(1), m.group(2)]
+
+
+def _loads(text):
+    try:
+        return json.loads(text) if text else None
+    except ValueError:
+        return None
+
+
+def parse_live_json(doc, game_id, detail=False):
+    """Scoreboard row from a `LiveApiTransport` document, or None unless the game is final.
+
+    Runs are summed from the per-half-inning scoreboard (VisitingHomeType 1 is
+    the away team, 2 the home team), as the site's page does.
+    """
+    doc = _loads(doc) if isinstance(doc, str) else doc
+    res = (doc or {}).get('result') or {}
+    if not res.get('Success'):
+        return None
+    game = _loads(res.get('CurtGameDetailJson')) or {}
+    boards = _loads(res.get('ScoreboardJson')) or []
+    # 3 = final; anything else (scheduled, in progress, suspended) is fetched again later
+    if not boards or game.get('GameStatus', 3) != 3:
+        return None
+    sides = {'away': [], 'home': []}
+    for b in sorted(boards, key=lambda b: b.get('InningSeq') or 0):
+        side = {'1': 'away', '2': 'home'}.get(str(b.get('VisitingHomeType')))
+        if side:
+            sides[side].append(b)
+    teams = doc.get('teams') or [None, None]
+    row = _scoreboard_row({
+        'away_team': game.get('VisitingTeamName') or teams[0],
+        'home_team': game.get('HomeTeamName') or teams[1],
+        'away_score': sum(b.get('ScoreCnt') or 0 for b in sides['away']),
+        'home_score': sum(b.get('ScoreCnt') or 0 for b in sides['home']),
+    }, game_id)
+    if row is None or not detail:
+        return row
+    row['venue'] = game.get('FieldAbbe')
+    for side, bs in sides.items():
+        row[f'{side}_r'] = row[f'{side}_score']
+        row[f'{side}_h'] = sum(b.get('HittingCnt') or 0 for b in bs)
+        row[f'{side}_e'] = sum(b.get('ErrorCnt') or 0 for b in bs)
+        row[f'{side}_innings'] = ' '.join(str(b.get('ScoreCnt') or 0) for b in bs)
+    return row
+
+
+# ---- Transports ----
+class HttpTransport:
+    """Plain HTTP GET; works against saved/pre-rendered pages and the fixture server."""
+
+    def __init__(self, timeout=15):
+        self.timeout = timeout
+
+    def fetch(self, url):
+        req = Request(url, headers={'User-Agent': USER_AGENT})
+        with urlopen(req, timeout=self.timeout) as resp:
+            charset = resp.headers.get_content_charset() or 'utf-8'
+            return resp.read().decode(charset, errors='replace')
+
+    def close(self):
+        pass
+
+
+class LiveApiTransport:
+    """Box page GET, then the page's own POST to /box/getlive; returns the JSON.
+
+    The document handed back is `{"url", "teams", "result"}` with the API's
+    response as `result`, so archived copies re-parse offline like HTML pages.
+    A page that already contains a rendered scoreboard (a saved page, the
+    fixture server) is returned as is. Each worker thread keeps its own cookie
+    jar, since the anti-forgery token is tied to a cookie.
+    """
+
+    def __init__(self, timeout=15):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _opener(self):
+        opener = getattr(self._local, 'opener', None)
+        if opener is None:
+            opener = self._local.opener = build_opener(HTTPCookieProcessor(CookieJar()))
+        return opener
+
+    def _read(self, req):
+        with self._opener().open(req, timeout=self.timeout) as resp:
+            charset = resp.headers.get_content_charset() or 'utf-8'
+            return resp.read().decode(charset, errors='replace')
+
+    def fetch(self, url):
+        html = self._read(Request(url, headers={'User-Agent': USER_AGENT}))
+        form = _BoxFormParser()
+        form.feed(html)
+        if not form.fields or parse_box_html(html, '') is not None:
+            return html
+        body = self._read(Request(urljoin(url, LIVE_PATH), data=urlencode(form.fields).encode(),
+                                  headers={'User-Agent': USER_AGENT, 'Referer': url,
+                                           'X-Requested-With': 'XMLHttpRequest'}))
+        return json.dumps({'url': url, 'teams': form.teams, 'result': _loads(body)},
+                          ensure_ascii=False)
+
+    def close(self):
+        pass
+
+
+class BrowserTransport:
+    """Headless browser transport; each worker thread reuses one driver."""
+
+    SELECTOR = ".item.ScoreBoard .team.away"
+
+    def __init__(self, browser='chrome', wait=10):
+        self.browser = browser
+        self.wait = wait
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _new_driver(self):
+        from selenium import webdriver
+        if self.browser == 'safari':
+            return webdriver.Safari()
+        if self.browser == 'firefox':
+            opts = webdriver.FirefoxOptions()
+            opts.add_argument('-headless')
+            return webdriver.Firefox(options=opts)
+        opts = webdriver.ChromeOptions()
+        opts.add_argument('--headless=new')
+        return webdriver.Chrome(options=opts)
+
+    def _driver(self):
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            driver = self._new_driver()
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def fetch(self, url):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        driver = self._driver()
+        driver.get(url)
+        WebDriverWait(driver, self.wait).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, self.SELECTOR))
+        )
+        return driver.page_source
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+
+
+TRANSPORTS = ('api', 'http', 'chrome', 'firefox', 'safari')
+
+
+def make_transport(name='api'):
+    if name == 'api':
+        return LiveApiTransport()
+    if name == 'http':
+        return HttpTransport()
+    return BrowserTransport(browser=name)
+
+
+# ---- Rate limiting ----
+class RateLimiter:
+    """Spaces out requests per host to at most `rate` per second."""
+
+    def __init__(self, rate=2.0):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# ---- Checkpoint ----
+class Checkpoint:
+    """Append-only JSON-lines log of fetched games, keyed by game_id.
+
+    Games whose page had no final score are logged with an empty row; they
+    only count as finished when `pending(..., skip_empty=True)` asks for it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    self.done[rec['game_id']] = rec.get('row')
+
+    def pending(self, game_ids, skip_empty=False):
+        """The games of `game_ids` still to fetch."""
+        return [g for g in game_ids
+                if g not in self.done or (self.done[g] is None and not skip_empty)]
+
+    def record(self, game_id, row):
+        with self._lock:
+            self.done[game_id] = row
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'game_id': game_id, 'row': row}, ensure_ascii=False) + '\n')
+
+
+# ---- Crawl ----
+def _fetch_one(transport, limiter, url, game_id, retries, backoff, archive=None, year=None):
+    # only transport errors are retried; a page that parses to no final score
+    # is an answer (not played yet), left for the next run via the checkpoint
+    for attempt in range(retries + 1):
+        limiter.wait(url)
+        try:
+            html = transport.fetch(url)
+        except Exception as e:
+            if attempt == retries:
+                raise FetchError(f"{url}: {e}") from e
+        else:
+            if archive is not None:
+                archive.put(year, game_id, html)
+            return parse_box(html, game_id)
+        time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+
+
+def crawl(year, game_ids, transport=None, workers=4, rate=2.0, retries=3,
+          backoff=0.5, checkpoint=None, kind='A', base_url=BOX_URL, verbose=True, archive=None,
+          skip_empty=False):
+    """Fetch every game in `game_ids`, skipping those already in the checkpoint.
+
+    Returns the parsed rows (checkpointed ones included) ordered by game_id.
+    Games whose page has no final score (not yet played, postponed, or a
+    transport that could not see the scoreboard) are recorded as empty and
+    fetched again on the next run, unless `skip_empty`; games that fail with
+    transport errors are always retried. With an `archive.Archive`, every
+    fetched page is also stored raw so it can be re-parsed offline later.
+    """
+    own_transport = transport is None
+    transport = transport or LiveApiTransport()
+    ckpt = checkpoint if isinstance(checkpoint, Checkpoint) else Checkpoint(checkpoint)
+    limiter = RateLimiter(rate)
+    todo = ckpt.pending(game_ids, skip_empty)
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_fetch_one, transport, limiter,
+                            base_url.format(year=year, kind=kind, game_id=g),
+                            g, retries, backoff, archive, year): g
+                for g in todo
+            }
+            for fut in as_completed(futures):
+                g = futures[fut]
+                try:
+                    row = fut.result()
+                except FetchError as e:
+                    failed.append(g)
+                    if verbose:
+                        print("⚠️ 擷取失敗:", e)
+                    continue
+                ckpt.record(g, row)
+                if verbose and row:
+                    print(f"✅ {g} {row['away_team']} {row['away_score']} : "
+                          f"{row['home_score']} {row['home_team']}")
+    finally:
+        if own_transport:
+            transport.close()
+    if verbose and failed:
+        print(f"⚠️ {len(failed)} 場失敗，重新執行即可續抓")
+    wanted = set(game_ids)
+    return [ckpt.done[g] for g in sorted(ckpt.done) if g in wanted and ckpt.done[g]]
+
+
+# ---- Incremental season sync ----
+def season_path(year, data_dir='.'):
+    return os.path.join(data_dir, f"cpbl_{year}.csv")
+
+
+def missing_games(known_ids, lookahead=10):
+    """Game IDs to request: gaps below the highest known game plus the next `lookahead`."""
+    nums = sorted(int(g) for g in known_ids)
+    top = nums[-1] if nums else 0
+    gaps = sorted(set(range(1, top + 1)) - set(nums))
+    return [str(i).zfill(3) for i in gaps + list(range(top + 1, top + lookahead + 1))]
+
+
+def sync_season(year, data_dir='.', lookahead=10, **crawl_kwargs):
+    """Fetch only games missing from cpbl_YYYY.csv and merge them in atomically.
+
+    Each missing ID costs one request: lookahead games that have no final
+    score yet come back empty without retries and are tried again on the
+    next sync. Returns the number of new games written.
+    """
+    import pandas as pd
+    path = season_path(year, data_dir)
+    if os.path.exists(path):
+        existing = pd.read_csv(path, dtype={'game_id': str}, encoding='utf-8-sig')
+    else:
+        existing = pd.DataFrame(columns=['game_id', 'away_team', 'home_team', 'away_score', 'home_score'])
+    todo = missing_games(existing['game_id'], lookahead)
+    rows = crawl(year, todo, **crawl_kwargs)
+    if not rows:
+        return 0
+    new = pd.DataFrame(rows)[existing.columns]
+    merged = pd.concat([existing, new], ignore_index=True)
+    merged = merged.drop_duplicates('game_id', keep='first')
+    merged = merged.sort_values('game_id', key=lambda s: s.astype(int))
+    write_csv_atomic(merged, path)
+    return len(merged) - len(existing)
+
+
+def write_csv_atomic(df, path):
+    """Write `df` next to `path` and swap it in, so readers never see a half-written file."""
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                               dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8-sig', newline='') as f:
+            df.to_csv(f, index=False)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# ---- Offline fixture server ----
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    # /box?year=Y&gameSno=NNN -> box_Y_NNN.html, debug_NNN.html, or the fallback page
+    fallback = None
+
+    def do_GET(self):
+        u = urlparse(self.path)
+        if u.path.rstrip('/') != '/box':
+            return super().do_GET()
+        q = parse_qs(u.query)
+        year = q.get('year', [''])[0]
+        sno = q.get('gameSno', [''])[0]
+        candidates = [f'box_{year}_{sno}.html', f'debug_{sno}.html']
+        path = next((os.path.join(self.directory, c) for c in candidates
+                     if os.path.exists(os.path.join(self.directory, c))), self.fallback)
+        if not path:
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_fixtures(directory, fallback=None, port=0):
+    """Serve saved box pages on localhost; returns (server, base_url).
+
+    Run `server.serve_forever()` in a thread and pass `base_url` to `crawl`.
+    """
+    handler = type('FixtureHandler', (_FixtureHandler,), {'fallback': fallback})
+    server = ThreadingHTTPServer(('127.0.0.1', port), partial(handler, directory=directory))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/box?year={{year}}&KindCode={{kind}}&gameSno={{game_id}}"
+    return server, base_url
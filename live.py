@@ -0,0 +1,245 @@
+"""Live in-season metrics maintained incrementally from new game results.
+
+`LiveMetrics` tails the cpbl_YYYY.csv files (and optionally an append-only
+JSON-lines feed), so each poll only reads bytes appended since the last one.
+Every new game updates per-(year, team) running statistics: home/away counts
+and sums, and a Welford accumulator over paired home-minus-away differences
+(the i-th home game is paired with the i-th away game, as in `stats`). Only
+the teams touched by new games have their t, p and Cohen's d recomputed.
+
+Games are keyed by (year, game_id) and counted once, whichever source
+delivers them first, so a feed game that later lands in cpbl_YYYY.csv (e.g.
+via the daily sync) is not counted twice. Feed records must carry `game_id`;
+records without one are skipped and counted in `skipped`. Lines that don't
+parse (torn JSON, missing fields, non-numeric scores) are skipped and counted
+in `malformed`; the rest of the poll carries on.
+"""
+import json
+import math
+import os
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import store
+from stats import METRICS
+
+
+class Welford:
+    """Running mean and sum of squared deviations."""
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def sd(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float('nan')
+
+
+class TeamSeason:
+    """Sufficient statistics for one team's season."""
+
+    def __init__(self):
+        self.counts = {'home': 0, 'away': 0}
+        self.sums = {side: dict.fromkeys(METRICS, 0.0) for side in ('home', 'away')}
+        self.pending = {'home': deque(), 'away': deque()}
+        self.diffs = {m: Welford() for m in METRICS}
+
+    def add(self, side, values):
+        self.counts[side] += 1
+        for m, v in values.items():
+            self.sums[side][m] += v
+        self.pending[side].append(values)
+        other = 'away' if side == 'home' else 'home'
+        if self.pending[other]:
+            h = self.pending['home'].popleft()
+            a = self.pending['away'].popleft()
+            for m in METRICS:
+                self.diffs[m].add(h[m] - a[m])
+
+    def rows(self):
+        out = {}
+        n_home, n_away = self.counts['home'], self.counts['away']
+        for m in METRICS:
+            w = self.diffs[m]
+            hm = self.sums['home'][m] / n_home if n_home else float('nan')
+            am = self.sums['away'][m] / n_away if n_away else float('nan')
+            if w.n > 1:
+                from scipy.stats import t as t_dist  # deferred until live mode is used
+                # numpy division so a zero spread gives inf/nan like the batch engine
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    sd = np.float64(w.sd)
+                    t = float(w.mean / (sd / math.sqrt(w.n)))
+                    d = float(w.mean / sd)
+                p = float(2 * t_dist.sf(abs(t), w.n - 1))
+            else:
+                t = p = d = float('nan')
+            out[m] = {'n_home': n_home, 'n_away': n_away, 'n': w.n, 'home_mean': hm,
+                      'away_mean': am, 'diff': hm - am, 't': t, 'p': p, 'd': d}
+        return out
+
+
+def _game_values(home_score, away_score):
+    # per-side metric values, matching the home_win/away_win and score columns
+    home = {'Win': float(home_score > away_score), 'Score': float(home_score)}
+    away = {'Win': float(away_score > home_score), 'Score': float(away_score)}
+    return home, away
+
+
+class LiveMetrics:
+    def __init__(self, data_dir=None, feed=None, team_map=store.TEAM_MAP):
+        self.data_dir = data_dir or store.DATA_DIR
+        self.feed = feed
+        self.team_map = team_map
+        self.version = 0
+        self._teams = {}      # (year, team) -> TeamSeason
+        self._rows = {}       # (year, team) -> {metric: stats row}
+        self._files = {}      # path -> {'offset', 'tail'} of what has been consumed
+        self._seen = set()    # (year, game_id) already folded in
+        self._feed_games = {}  # (year, game_id) -> feed record, replayed after a CSV rewrite
+        self.skipped = 0      # feed records without a game_id
+        self.malformed = 0    # CSV or feed lines that could not be parsed
+        self.ingested = 0     # games folded in so far
+        self._lock = threading.Lock()
+
+    # ---- ingestion ----
+    def add_game(self, year, game_id, away_team, home_team, away_score, home_score):
+        """Fold one result into the running statistics (raw or display team names).
+
+        Returns False for unknown teams and for a (year, game_id) already counted.
+        """
+        key = (year, str(game_id).strip().zfill(3))
+        if key in self._seen:
+            return False
+        home = self.team_map.get(home_team, home_team)
+        away = self.team_map.get(away_team, away_team)
+        if home not in self.team_map.values() or away not in self.team_map.values():
+            return False
+        hv, av = _game_values(int(home_score), int(away_score))
+        self._seen.add(key)
+        self.ingested += 1
+        for team, side, vals in ((home, 'home', hv), (away, 'away', av)):
+            ts = self._teams.setdefault((year, team), TeamSeason())
+            ts.add(side, vals)
+            self._rows[(year, team)] = ts.rows()
+        return True
+
+    @property
+    def games(self):
+        return sum(ts.counts['home'] for ts in self._teams.values())
+
+    def _reset_year(self, year):
+        for key in [k for k in self._teams if k[0] == year]:
+            del self._teams[key]
+            del self._rows[key]
+        self._seen = {k for k in self._seen if k[0] != year}
+
+    def _read_new(self, path, year):
+        # returns newly appended complete lines, or None if the file was rewritten
+        st = os.stat(path)
+        state = self._files.get(path)
+        with open(path, 'rb') as f:
+            if state:
+                if st.st_size < state['offset']:
+                    return None
+                # the last line we consumed must still be where we left it
+                f.seek(state['offset'] - len(state['tail']))
+                if f.read(len(state['tail'])) != state['tail']:
+                    return None
+            else:
+                state = self._files[path] = {'offset': 0, 'tail': b''}
+            f.seek(state['offset'])
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1   # leave a partially written last line for next time
+        if end == 0:
+            return []
+        lines = chunk[:end].splitlines(keepends=True)
+        state['offset'] += end
+        state['tail'] = lines[-1]
+        return [ln.decode('utf-8-sig').rstrip('\r\n') for ln in lines]
+
+    def _poll_csv(self, path, year):
+        lines = self._read_new(path, year)
+        if lines is None:
+            # rewritten (e.g. a sync filled gaps): replay the season from the top
+            self._files.pop(path, None)
+            self._reset_year(year)
+            lines = self._read_new(path, year)
+            replay = [g for (y, _), g in self._feed_games.items() if y == year]
+        else:
+            replay = []
+        added = 0
+        for line in lines:
+            if not line or line.startswith('game_id'):
+                continue
+            try:
+                gid, away, home, a_sc, h_sc = line.split(',')[:5]
+                added += self.add_game(year, gid, away, home, a_sc, h_sc)
+            except ValueError:
+                self.malformed += 1
+        # feed games the rewritten CSV doesn't have yet
+        for g in replay:
+            added += self._add_feed_game(g)
+        return added
+
+    def _add_feed_game(self, g):
+        return self.add_game(int(g['year']), g['game_id'], g['away_team'], g['home_team'],
+                             g['away_score'], g['home_score'])
+
+    def _poll_feed(self):
+        lines = self._read_new(self.feed, None)
+        if lines is None:
+            # the feed is append-only by contract; if it was replaced, follow its new end
+            self._files[self.feed] = {'offset': os.path.getsize(self.feed), 'tail': b''}
+            lines = []
+        added = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                g = json.loads(line)
+                if g.get('game_id') in (None, ''):
+                    self.skipped += 1
+                    continue
+                added += self._add_feed_game(g)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self.malformed += 1
+                continue
+            self._feed_games[(int(g['year']), str(g['game_id']).strip().zfill(3))] = g
+        return added
+
+    def poll(self):
+        """Ingest anything new; returns the (possibly bumped) version."""
+        with self._lock:
+            before = self.ingested
+            try:
+                for y in store.discover_years(self.data_dir):
+                    self._poll_csv(os.path.join(self.data_dir, f"cpbl_{y}.csv"), y)
+                if self.feed and os.path.exists(self.feed):
+                    self._poll_feed()
+            finally:
+                # even if a source failed part-way, what did go in must reach the sessions
+                if self.ingested != before:
+                    self.version += 1
+            return self.version
+
+    # ---- results ----
+    def cube(self):
+        """Current statistics in the `stats.metrics_cube` layout."""
+        with self._lock:
+            records = [dict(year=y, team=t, metric=m, **r)
+                       for (y, t), rows in self._rows.items() for m, r in rows.items()]
+        if not records:
+            return pd.DataFrame()
+        return (pd.DataFrame.from_records(records)
+                .set_index(['year', 'team', 'metric'])
+                .sort_index(level=['year', 'team'], sort_remaining=False))
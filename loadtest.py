@@ -0,0 +1,211 @@
+"""Concurrent-session load test for the dashboard.
+
+Drives the real app.py headlessly through Streamlit's AppTest. Every
+simulated session is its own AppTest in its own process: AppTest is not safe
+to run from several threads of one interpreter (script compiles and widget
+state collide). The sessions therefore behave like app replicas behind a
+load balancer that share only the on-disk caches (store, shared_cache).
+Each process loads the app once untimed (with warm-up), all of them wait at
+a barrier, and then each replays a random but seeded sequence of
+interactions (year, metric, α slider, team selection, drill-down, test
+method) with every rerun timed. A failing step is recorded as an error
+rather than ending the run. Runs offline against the bundled cpbl_YYYY.csv
+files or a synthetic league:
+
+    python loadtest.py --sessions 8 --steps 20
+    python loadtest.py --sessions 16 --synthetic decades --out loadtest.jsonl
+"""
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import profiling
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(BASE_DIR, 'app.py')
+ACTION_WEIGHTS = {'year': 3, 'metric': 2, 'alpha': 3, 'teams': 3, 'drill': 2, 'method': 1}
+
+
+def _step(at, action, rng):
+    sb = at.sidebar
+    if action == 'year':
+        box = sb.selectbox[0]
+        box.select(rng.choice(box.options))
+    elif action == 'metric':
+        box = sb.selectbox[1]
+        box.select(rng.choice(box.options))
+    elif action == 'alpha':
+        sb.slider[0].set_value(round(rng.uniform(0.01, 0.3), 2))
+    elif action == 'teams':
+        ms = sb.multiselect[0]
+        opts = list(ms.options)
+        ms.set_value(rng.sample(opts, rng.randint(1, len(opts))))
+    elif action == 'drill':
+        box = sb.selectbox[2]
+        box.select(rng.choice(box.options))
+    elif action == 'method':
+        radio = sb.radio[0]
+        radio.set_value(rng.choice(radio.options))
+    return at
+
+
+def _quiet_streamlit():
+    # AppTest sessions have no server runtime; silence the per-session notices
+    import streamlit.testing.v1  # noqa: F401  (creates streamlit's loggers)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def run_session(sid, steps, seed, timeout, warmup, barrier, out):
+    """One session in its own process; puts (records, rss_start, rss_end) on `out`."""
+    _quiet_streamlit()
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed * 1000 + sid)
+    actions, weights = zip(*ACTION_WEIGHTS.items())
+    plan = ['open'] + rng.choices(actions, weights, k=steps)
+    records = []
+    try:
+        if warmup:
+            AppTest.from_file(APP, default_timeout=timeout).run()
+    except Exception:
+        pass  # the timed 'open' step reports it
+    try:
+        barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        pass  # another session failed to start; run anyway
+    rss_start = profiling.rss_mb()
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    for step, action in enumerate(plan):
+        t0 = time.perf_counter()
+        err = None
+        try:
+            if action != 'open':
+                _step(at, action, rng)
+            at.run()
+            if at.exception:
+                err = str(at.exception[0].message)[:200]
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"[:200]
+        records.append({'session': sid, 'step': step, 'action': action, 'ts': time.time(),
+                        'ms': round((time.perf_counter() - t0) * 1000, 2),
+                        'error': err is not None, 'message': err})
+    out.put((records, rss_start, profiling.rss_mb()))
+
+
+def summarize(results, wall, rss_start, rss_end):
+    ms = np.array([r['ms'] for r in results])
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (np.nan,) * 3
+    by_action = {}
+    for a in sorted({r['action'] for r in results}):
+        sel = np.array([r['ms'] for r in results if r['action'] == a])
+        by_action[a] = {'n': len(sel), 'p50_ms': round(float(np.percentile(sel, 50)), 1),
+                        'p95_ms': round(float(np.percentile(sel, 95)), 1)}
+    return {
+        'reruns': len(results),
+        'errors': sum(r['error'] for r in results),
+        'wall_s': round(wall, 2),
+        'throughput_rps': round(len(results) / wall, 2) if wall else None,
+        'p50_ms': round(float(p50), 1), 'p95_ms': round(float(p95), 1), 'p99_ms': round(float(p99), 1),
+        'max_ms': round(float(ms.max()), 1) if len(ms) else None,
+        'rss_start_mb': round(rss_start, 1), 'rss_end_mb': round(rss_end, 1),
+        'rss_growth_mb': round(rss_end - rss_start, 1),
+        'by_action': by_action,
+    }
+
+
+def load_test(sessions=8, steps=20, seed=0, timeout=120, warmup=True):
+    """Run the sessions concurrently, one process each; returns (summary, per-rerun records).
+
+    With `warmup`, every process loads the app once untimed before the
+    barrier, so memory growth and latencies reflect steady serving rather
+    than imports and cold caches. RSS figures are summed over the session
+    processes.
+    """
+    barrier = mp.Barrier(sessions)
+    out = mp.Queue()
+    procs = [mp.Process(target=run_session, args=(sid, steps, seed, timeout, warmup, barrier, out))
+             for sid in range(sessions)]
+    for p in procs:
+        p.start()
+    results, rss_start, rss_end = [], 0.0, 0.0
+    for p in procs:
+        try:
+            records, r0, r1 = out.get(timeout=timeout * (steps + 2))
+        except queue.Empty:
+            break  # a session process died; summarize the ones that reported
+        results += records
+        rss_start += r0
+        rss_end += r1
+    for p in procs:
+        p.join(timeout)
+    missing = sessions - len({r['session'] for r in results})
+    if results:
+        ts = [r['ts'] for r in results]
+        first = min(r['ts'] - r['ms'] / 1000 for r in results)
+        wall = max(ts) - first
+    else:
+        wall = 0.0
+    summary = summarize(results, wall, rss_start, rss_end)
+    summary['sessions_lost'] = missing
+    return summary, results
+
+
+def use_synthetic(preset, out_dir, seed=0):
+    """Point the app at a synthetic league in `out_dir` (real CPBL team names only)."""
+    import benchmark
+    import store
+
+    cfg = dict(benchmark.PRESETS[preset])
+    if cfg['teams'] > len(store.TEAM_MAP):
+        raise SystemExit(f"preset {preset!r} has {cfg['teams']} teams; the app maps at most "
+                         f"{len(store.TEAM_MAP)} (store.TEAM_MAP)")
+    benchmark.synthetic_league(out_dir, seed=seed, **cfg)
+    os.environ['CPBL_DATA_DIR'] = out_dir
+    store.DATA_DIR = out_dir   # already imported by benchmark
+    return cfg
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test app.py with concurrent headless sessions.")
+    ap.add_argument('--sessions', type=int, default=8, help="simultaneous sessions")
+    ap.add_argument('--steps', type=int, default=20, help="interactions per session after the first load")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--synthetic', choices=['today', 'decades'],
+                    help="run against a synthetic league instead of the bundled CSVs")
+    ap.add_argument('--timeout', type=float, default=120, help="per-rerun timeout in seconds")
+    ap.add_argument('--cold', action='store_true', help="skip the untimed warm-up session")
+    ap.add_argument('--out', help="append the summary as a JSON line to this file")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='cpbl_load_') as tmp:
+        config = use_synthetic(args.synthetic, tmp, args.seed) if args.synthetic else 'bundled'
+        summary, _ = load_test(args.sessions, args.steps, args.seed, args.timeout, warmup=not args.cold)
+
+    print(f"{args.sessions} sessions × {args.steps + 1} reruns ({config})")
+    print(f"  p50 {summary['p50_ms']} ms • p95 {summary['p95_ms']} ms • p99 {summary['p99_ms']} ms"
+          f" • max {summary['max_ms']} ms")
+    print(f"  {summary['throughput_rps']} reruns/s over {summary['wall_s']} s • errors {summary['errors']}"
+          + (f" • {summary['sessions_lost']} sessions lost" if summary['sessions_lost'] else ''))
+    print(f"  RSS {summary['rss_start_mb']} → {summary['rss_end_mb']} MB ({summary['rss_growth_mb']:+})")
+    for a, s in summary['by_action'].items():
+        print(f"    {a:<8}{s['n']:>5}  p50 {s['p50_ms']:>8} ms  p95 {s['p95_ms']:>8} ms")
+    if args.out:
+        with open(args.out, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dict(summary, ts=time.time(), sessions=args.sessions, steps=args.steps,
+                                    seed=args.seed, warmup=not args.cold, config=config),
+                               ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
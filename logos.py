@@ -0,0 +1,82 @@
+"""Process-wide team logo registry.
+
+Each logo is read, optionally downsized and base64-encoded once per process;
+tables carry the team name and attach the <img> tag only when rendering.
+Charts get decoded pixel arrays from the same registry.
+"""
+import base64
+import io
+import os
+from functools import lru_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOGO_DIR = os.path.join(BASE_DIR, 'logos')
+DISPLAY_WIDTH = 32
+
+LOGO_FILES = {
+    "CTBC Brothers": "ctbc_brothers.png",
+    "WeiChuan Dragons": "weichuan_dragons.png",
+    "Rakuten Monkeys": "rakuten_monkeys.png",
+    "Uni-Lions": "uni_lions.png",
+    "Fubon Guardians": "fubon_guardians.png",
+    "TSG Hawks": "tsg_hawks.png"
+}
+
+
+def logo_path(team):
+    fname = LOGO_FILES.get(team)
+    return os.path.join(LOGO_DIR, fname) if fname else None
+
+
+def _downsize(data, px):
+    # keep ~2x the display width so logos stay sharp on high-DPI screens
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+    with Image.open(io.BytesIO(data)) as im:
+        if max(im.size) <= px:
+            return data
+        im.thumbnail((px, px))
+        buf = io.BytesIO()
+        im.save(buf, format='PNG', optimize=True)
+    small = buf.getvalue()
+    return small if len(small) < len(data) else data
+
+
+@lru_cache(maxsize=None)
+def logo_data_uri(team, px=None):
+    """data:image/png URI for a team's logo ('' if unknown), downsized to `px` if given."""
+    path = logo_path(team)
+    if not path or not os.path.exists(path):
+        return ''
+    with open(path, 'rb') as f:
+        data = f.read()
+    if px:
+        data = _downsize(data, px)
+    return f'data:image/png;base64,{base64.b64encode(data).decode()}'
+
+
+@lru_cache(maxsize=None)
+def logo_array(team, px=40):
+    """Decoded RGBA pixels of a team's logo fitted into `px` × `px` (None if unknown).
+
+    For matplotlib charts: decoded and resized once per process instead of
+    `plt.imread` per chart.
+    """
+    path = logo_path(team)
+    if not path or not os.path.exists(path):
+        return None
+    import numpy as np
+    from PIL import Image
+    with Image.open(path) as im:
+        im = im.convert('RGBA')
+        im.thumbnail((px, px), Image.LANCZOS)
+        return np.asarray(im)
+
+
+@lru_cache(maxsize=None)
+def logo_img(team, width=DISPLAY_WIDTH):
+    """<img> tag for HTML tables; '' when the team has no logo."""
+    uri = logo_data_uri(team, px=width * 2)
+    return f'<img src="{uri}" width="{width}"/>' if uri else ''
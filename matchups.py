@@ -0,0 +1,82 @@
+"""Head-to-head results for every pairing of teams.
+
+Each game is scattered twice into a (year, side, team, opponent) grid, once
+from the home team's perspective and once from the away team's, using the
+integer codes of the store's team categoricals: a single `bincount` per
+measure (games, wins, run differential) fills the grid for every season.
+Any season range is then a sum over the year axis, so the matrix for one
+season or all of them costs the same.
+"""
+import numpy as np
+import pandas as pd
+
+HOME, AWAY = 0, 1
+
+# display label -> column of `Matchups.table`
+MEASURES = {
+    'Win rate': 'win_rate',
+    'Games': 'games',
+    'Run differential': 'run_diff',
+    'Home advantage (home − away win rate)': 'home_adv',
+}
+
+
+class Matchups:
+    def __init__(self, df_all):
+        home = df_all['home_team']
+        self.teams = list(home.cat.categories)
+        self.years = sorted(int(y) for y in df_all['year'].unique())
+        t, y = len(self.teams), len(self.years)
+        h = home.cat.codes.to_numpy(np.int64)
+        a = df_all['away_team'].cat.set_categories(self.teams).cat.codes.to_numpy(np.int64)
+        yi = np.searchsorted(self.years, df_all['year'].to_numpy())
+        # flat (year, side, team, opponent) cell of each game, from both perspectives
+        cell = np.concatenate([((yi * 2 + HOME) * t + h) * t + a,
+                               ((yi * 2 + AWAY) * t + a) * t + h])
+        margin = (df_all['home_score'].to_numpy(np.int64) - df_all['away_score'].to_numpy(np.int64))
+        wins = np.concatenate([df_all['home_win'].to_numpy(), df_all['away_win'].to_numpy()])
+        size, shape = y * 2 * t * t, (y, 2, t, t)
+        self.games = np.bincount(cell, minlength=size).reshape(shape)
+        self.wins = np.bincount(cell, weights=wins, minlength=size).reshape(shape)
+        self.run_diff = np.bincount(cell, weights=np.concatenate([margin, -margin]),
+                                    minlength=size).reshape(shape)
+
+    def _span(self, years):
+        if years is None:
+            return slice(None)
+        lo, hi = min(years), max(years)
+        return slice(np.searchsorted(self.years, lo), np.searchsorted(self.years, hi, side='right'))
+
+    def table(self, years=None):
+        """Long table indexed by (team, opponent) for the seasons spanned by `years`.
+
+        Columns: games, wins, win_rate, run_diff, home_games, home_win_rate,
+        away_games, away_win_rate, home_adv. Pairings that never met are
+        left out.
+        """
+        sl = self._span(years)
+        g, w, r = (arr[sl].sum(axis=0) for arr in (self.games, self.wins, self.run_diff))
+        games, wins = g.sum(axis=0), w.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            home_rate = w[HOME] / g[HOME]
+            away_rate = w[AWAY] / g[AWAY]
+            win_rate = wins / games
+        index = pd.MultiIndex.from_product([self.teams, self.teams], names=['team', 'opponent'])
+        out = pd.DataFrame({
+            'games': games.ravel(),
+            'wins': wins.ravel().astype(np.int64),
+            'win_rate': win_rate.ravel(),
+            'run_diff': r.sum(axis=0).ravel().astype(np.int64),
+            'home_games': g[HOME].ravel(),
+            'home_win_rate': home_rate.ravel(),
+            'away_games': g[AWAY].ravel(),
+            'away_win_rate': away_rate.ravel(),
+            'home_adv': (home_rate - away_rate).ravel(),
+        }, index=index)
+        return out[out['games'] > 0]
+
+    def matrix(self, column, years=None):
+        """team × opponent grid of one `table` column (NaN on the diagonal)."""
+        tab = self.table(years)
+        teams = sorted(set(tab.index.get_level_values('team')))
+        return tab[column].unstack('opponent').reindex(index=teams, columns=teams)
@@ -0,0 +1,231 @@
+"""Per-rerun instrumentation for the Streamlit app.
+
+Each script run records timing spans for its stages, hit/miss counts for the
+instrumented `st.cache_data` functions, and the process's resident memory at
+the start and end of the run (plus the difference). Finished runs are kept in
+a small in-process ring buffer for the hidden debug panel (`?debug=1`) and,
+when CPBL_PROFILE_LOG is set, appended to that file as JSON lines. Set
+CPBL_PROFILE_MEMORY=1 to also trace Python allocations with tracemalloc; that
+peak is process-wide (since the latest run start in any session), so with
+concurrent sessions it is not one rerun's own.
+
+The process's first run also fills `STARTUP` (cold import time and the time
+to the first full render) and warns on stderr when it exceeds
+CPBL_STARTUP_BUDGET_MS.
+"""
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+LOG_PATH = os.environ.get('CPBL_PROFILE_LOG')
+TRACE_MEMORY = os.environ.get('CPBL_PROFILE_MEMORY') == '1'
+STARTUP_BUDGET_MS = float(os.environ.get('CPBL_STARTUP_BUDGET_MS', 3000))
+
+RECENT = deque(maxlen=200)
+CACHE_TOTALS = Counter()
+STARTUP = {}  # the process's first run: cold imports and first full render
+_local = threading.local()
+_log_lock = threading.Lock()
+
+if TRACE_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def _max_rss_mb():
+    # process-lifetime high-water mark; ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if os.uname().sysname == 'Darwin' else rss / 1024
+
+
+def rss_mb():
+    """Current resident set size (falls back to the peak where /proc is missing)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1 << 20)
+    except OSError:
+        return _max_rss_mb()
+
+
+def current_run():
+    return getattr(_local, 'run', None)
+
+
+def start_run(t0=None, **meta):
+    """Begin recording a script run on this thread (timed from `t0` if given)."""
+    if TRACE_MEMORY:
+        tracemalloc.reset_peak()
+    run = {'ts': time.time(), 'meta': meta, 'spans': [], 'cache': {},
+           'rss_start_mb': round(rss_mb(), 1),
+           '_t0': time.perf_counter() if t0 is None else t0}
+    _local.run = run
+    return run
+
+
+def end_run():
+    """Finish the current run, store it and (optionally) log it; returns the record."""
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    run['total_ms'] = round((time.perf_counter() - run.pop('_t0')) * 1000, 2)
+    run['rss_end_mb'] = round(rss_mb(), 1)
+    run['rss_delta_mb'] = round(run['rss_end_mb'] - run['rss_start_mb'], 1)
+    run['process_max_rss_mb'] = round(_max_rss_mb(), 1)
+    if TRACE_MEMORY:
+        run['process_traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 2)
+    with _log_lock:
+        first = not STARTUP
+        if first:
+            spans = dict(run['spans'])
+            STARTUP.update(imports_ms=spans.get('imports'), first_render_ms=run['total_ms'],
+                           budget_ms=STARTUP_BUDGET_MS, over_budget=run['total_ms'] > STARTUP_BUDGET_MS)
+    if first:
+        run['startup'] = dict(STARTUP)
+        if STARTUP['over_budget']:
+            print(f"⚠️ first render took {run['total_ms']:.0f} ms "
+                  f"(budget {STARTUP_BUDGET_MS:.0f} ms, imports {STARTUP['imports_ms']} ms)", file=sys.stderr)
+    RECENT.append(run)
+    if LOG_PATH:
+        with _log_lock, open(LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, ensure_ascii=False, default=str) + '\n')
+    return run
+
+
+@contextmanager
+def span(name):
+    """Time a stage of the current run (no-op outside a run)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        run = current_run()
+        if run is not None:
+            run['spans'].append((name, round((time.perf_counter() - t0) * 1000, 3)))
+
+
+def mark(name, since=None):
+    """Record a point-in-time span measured from `since` (default: run start)."""
+    run = current_run()
+    if run is not None:
+        t0 = run['_t0'] if since is None else since
+        run['spans'].append((name, round((time.perf_counter() - t0) * 1000, 3)))
+
+
+def _count(name, key):
+    CACHE_TOTALS[f'{name}.{key}'] += 1
+    run = current_run()
+    if run is not None:
+        stats = run['cache'].setdefault(name, {'calls': 0, 'misses': 0})
+        stats[key] += 1
+
+
+def cache_event(name, miss=False):
+    """Count a lookup in a hand-rolled cache (shows up next to the st.cache_* ones)."""
+    _count(name, 'calls')
+    if miss:
+        _count(name, 'misses')
+
+
+class LRUCache:
+    """Process-wide LRU for hand-rolled caches, counted under `name` like the st.cache_* ones."""
+
+    def __init__(self, name, maxsize=256):
+        self.name = name
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        """Value for `key`, calling `build()` only on a miss."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        cache_event(self.name, miss=value is None)
+        if value is None:
+            value = build()
+            with self._lock:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _instrumented(kind, func, cache_kwargs):
+    def deco(fn):
+        import streamlit as st
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            _count(name, 'misses')  # only reached when the cache misses
+            return fn(*args, **kwargs)
+
+        cached = getattr(st, kind)(**cache_kwargs)(body)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            _count(name, 'calls')
+            with span(name):
+                return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return deco(func) if func is not None else deco
+
+
+def cache_data(func=None, **cache_kwargs):
+    """`st.cache_data` that records a span plus call/miss counts per run."""
+    return _instrumented('cache_data', func, cache_kwargs)
+
+
+def cache_resource(func=None, **cache_kwargs):
+    """`st.cache_resource` (shared, uncopied objects) with the same instrumentation."""
+    return _instrumented('cache_resource', func, cache_kwargs)
+
+
+def export_jsonl(runs=None):
+    """Recent runs as JSON lines."""
+    runs = RECENT if runs is None else runs
+    return ''.join(json.dumps(r, ensure_ascii=False, default=str) + '\n' for r in runs)
+
+
+def render_panel(st):
+    """Debug panel listing the last run's spans, cache counters and recent totals."""
+    runs = list(RECENT)
+    with st.expander("🛠 Debug: rerun profile", expanded=True):
+        if not runs:
+            st.write("No completed runs yet.")
+            return
+        last = runs[-1]
+        if STARTUP:
+            st.write(f"Startup: imports {STARTUP['imports_ms']} ms • first render {STARTUP['first_render_ms']} ms"
+                     f" • budget {STARTUP['budget_ms']:.0f} ms" + (" ⚠️" if STARTUP['over_budget'] else " ✅"))
+        st.write(f"Last rerun: {last['total_ms']} ms • RSS {last['rss_start_mb']} → {last['rss_end_mb']} MB"
+                 f" ({last['rss_delta_mb']:+} MB) • process max RSS {last['process_max_rss_mb']} MB"
+                 + (f" • process-wide traced peak {last['process_traced_peak_mb']} MB"
+                    if 'process_traced_peak_mb' in last else ''))
+        st.table([{'stage': n, 'ms': ms} for n, ms in last['spans']])
+        if last['cache']:
+            st.table([{'function': n, 'calls': c['calls'], 'misses': c['misses'],
+                       'hits': c['calls'] - c['misses']} for n, c in last['cache'].items()])
+        totals = sorted(r['total_ms'] for r in runs)
+        st.write(f"{len(runs)} recent reruns • median {totals[len(totals) // 2]} ms • max {totals[-1]} ms")
+        st.download_button("Export JSON lines", export_jsonl(runs),
+                           file_name='cpbl_profile.jsonl', mime='application/jsonl')
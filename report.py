@@ -0,0 +1,138 @@
+"""Headless batch report: static HTML, JSON and PNG for every season.
+
+Seasons are discovered the same way the dashboard finds them (every
+cpbl_YYYY.csv in the data directory) and rendered in a process pool, one
+worker per season; an extra all-seasons page pools every game. The output
+directory is self-contained and can be served from any static host or CDN:
+
+    python report.py --out site/
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import logos
+import stats
+import Visualization
+import store
+import tables
+
+CSS = """
+body { font-family: sans-serif; margin: 2rem; color: #000; }
+h1, h2 { color: #0060B0; }
+table { width: 100%; border-collapse: collapse; }
+th, td { text-align: center; border-bottom: 1px solid #ddd; padding: 8px; }
+img.chart { max-width: 48%; margin: 1%; }
+"""
+
+
+def _json_dump(obj, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=1)
+
+
+# ---- HTML ----
+def _table_html(table, cols, alpha, logo_prefix):
+    head = ''.join(f'<th>{html.escape(c)}</th>' for c in cols)
+    rows = []
+    for _, r in table.iterrows():
+        cells = []
+        for c in cols:
+            if c == 'Logo':
+                fname = logos.LOGO_FILES.get(r['Team'])
+                cells.append(f'<td><img src="{logo_prefix}{fname}" width="32"/></td>' if fname else '<td></td>')
+            else:
+                cells.append(f'<td>{html.escape(str(r[c]))}</td>')
+        rows.append('<tr>' + ''.join(cells) + '</tr>')
+    return f'<table><thead><tr>{head}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+
+
+def render_page(title, table, charts, alpha, logo_prefix='../logos/', nav=''):
+    table = tables.mark_significance(table, alpha)
+    sections = []
+    for label, cols in (('Win Rate', tables.WIN_COLS), ('Score Difference', tables.SCORE_COLS)):
+        sections.append(f'<h2>{label}</h2>' + _table_html(table, cols, alpha, logo_prefix))
+    imgs = ''.join(f'<img class="chart" src="{c}" alt="{c}"/>' for c in charts)
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<style>{CSS}</style></head><body>{nav}<h1>{html.escape(title)}</h1>'
+            f'<p>α={alpha} • ★ indicates p &lt; α • metrics.json holds the full-precision results</p>'
+            f'{"".join(sections)}<h2>Charts</h2>{imgs}</body></html>')
+
+
+# ---- Workers ----
+def _write_report(res, key, title, out_root, alpha, version):
+    out_dir = os.path.join(out_root, key)
+    os.makedirs(out_dir, exist_ok=True)
+    table = tables.team_table(res)
+    _json_dump({'season': key, 'data_version': version, 'alpha': alpha,
+                'teams': tables.results_records(res, alpha)},
+               os.path.join(out_dir, 'metrics.json'))
+    charts = Visualization.save_charts(Visualization.table_metrics(table), out_dir) if len(table) else []
+    nav = '<p><a href="../index.html">← all seasons</a></p>'
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(render_page(title, table, charts, alpha, nav=nav))
+    return {'season': key, 'teams': len(table), 'files': ['metrics.json', 'index.html'] + charts}
+
+
+def season_report(year, data_dir, out_root, alpha, version):
+    df_year, _ = store.load_games(data_dir, years=[year])
+    cube = stats.metrics_cube(df_year)
+    res = tables.season_results(cube, year)
+    return _write_report(res, str(year), f"CPBL {year} Home/Away Analysis", out_root, alpha, version)
+
+
+def all_seasons_report(data_dir, out_root, alpha, version):
+    df_all, years = store.load_games(data_dir)
+    teams = sorted(df_all['home_team'].dropna().unique())
+    res = stats.paired_tests(df_all, teams)
+    res = res[(res['n_home'] >= 2) & (res['n_away'] >= 2)]
+    title = f"CPBL {years[0]}–{years[-1]} Home/Away Analysis (all seasons)"
+    return _write_report(res, 'all', title, out_root, alpha, version)
+
+
+def build_report(out_root, data_dir=None, alpha=0.1, workers=None):
+    data_dir = data_dir or store.DATA_DIR
+    t0 = time.perf_counter()
+    # compile the store once up front so workers only read it
+    version = store.build_store(data_dir)['version']
+    years = store.discover_years(data_dir)
+    os.makedirs(os.path.join(out_root, 'logos'), exist_ok=True)
+    for fname in logos.LOGO_FILES.values():
+        src = os.path.join(logos.LOGO_DIR, fname)
+        if os.path.exists(src):
+            shutil.copy2(src, os.path.join(out_root, 'logos', fname))
+
+    with ProcessPoolExecutor(max_workers=workers or len(years) + 1) as pool:
+        futures = [pool.submit(season_report, y, data_dir, out_root, alpha, version) for y in years]
+        futures.append(pool.submit(all_seasons_report, data_dir, out_root, alpha, version))
+        summaries = [f.result() for f in futures]
+
+    links = ''.join(f'<li><a href="{s["season"]}/index.html">{s["season"]}</a> ({s["teams"]} teams)</li>'
+                    for s in summaries)
+    with open(os.path.join(out_root, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>CPBL Home/Away Reports</title>'
+                f'<style>{CSS}</style></head><body><h1>CPBL Home/Away Reports</h1><ul>{links}</ul></body></html>')
+    manifest = {'data_version': version, 'alpha': alpha, 'years': years,
+                'generated': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'reports': summaries}
+    _json_dump(manifest, os.path.join(out_root, 'manifest.json'))
+    return manifest, time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render static CPBL home/away reports for every season.")
+    ap.add_argument('--out', default='site', help="output directory")
+    ap.add_argument('--data-dir', help="directory with cpbl_YYYY.csv (default: CPBL_DATA_DIR or the repo)")
+    ap.add_argument('--alpha', type=float, default=0.1, help="significance level for ★ flags")
+    ap.add_argument('--workers', type=int, help="process pool size (default: one per season)")
+    args = ap.parse_args(argv)
+    manifest, secs = build_report(args.out, args.data_dir, args.alpha, args.workers)
+    n_files = sum(len(r['files']) for r in manifest['reports'])
+    print(f"🎉 {len(manifest['reports'])} reports, {n_files} files → {args.out} ({secs:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,55 +1,91 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import argparse
+import os
+import threading
 
-def fetch_cpbl_score(game_id):
+import pandas as pd
+
+from archive import Archive
+from ingest import BOX_URL, TRANSPORTS, crawl, make_transport, parse_box, serve_fixtures, sync_season
+
+
+def fetch_cpbl_score(game_id, year=2022, transport=None):
     # game_id 請用三位數字字串，如 "010"
-    url = f"https://www.cpbl.com.tw/box?year=2022&KindCode=A&gameSno={game_id}"
+    url = BOX_URL.format(year=year, kind='A', game_id=game_id)
     print("🔗 載入", url)
-    driver = webdriver.Safari()
-    driver.get(url)
-
+    own = transport is None
+    transport = transport or make_transport()
     try:
-        # 等到 ScoreBoard 裡的 away 隊出現，最多等 10 秒
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".item.ScoreBoard .team.away"))
-        )
-
-        away_team  = driver.find_element(By.CSS_SELECTOR, ".item.ScoreBoard .team.away .team_name a").text
-        away_score = driver.find_element(By.CSS_SELECTOR, ".item.ScoreBoard .team.away .score").text
-        home_team  = driver.find_element(By.CSS_SELECTOR, ".item.ScoreBoard .team.home .team_name a").text
-        home_score = driver.find_element(By.CSS_SELECTOR, ".item.ScoreBoard .team.home .score").text
-
-        print(f"✅ {away_team} {away_score} : {home_score} {home_team}")
-        return {
-            "game_id":    game_id,
-            "away_team":  away_team,
-            "home_team":  home_team,
-            "away_score": int(away_score),
-            "home_score": int(home_score)
-        }
-
+        return parse_box(transport.fetch(url), game_id)
     except Exception as e:
         print("⚠️ 擷取失敗:", e)
         return None
+    finally:
+        if own:
+            transport.close()
 
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Scrape CPBL box scores for one season.")
+    ap.add_argument('--year', type=int, default=2022)
+    ap.add_argument('--first', type=int, default=1)
+    ap.add_argument('--last', type=int, default=300)
+    ap.add_argument('--transport', default='api', choices=TRANSPORTS,
+                    help="api: the site's live-box JSON (default); http: pre-rendered pages only; "
+                         "chrome/firefox/safari: headless browser")
+    ap.add_argument('--workers', type=int, default=4)
+    ap.add_argument('--rate', type=float, default=2.0, help="max requests per second per host")
+    ap.add_argument('--retries', type=int, default=3)
+    ap.add_argument('--checkpoint', help="JSON-lines resume file (default: cpbl_YYYY_scores.ckpt)")
+    ap.add_argument('--skip-empty', action='store_true',
+                    help="don't refetch games the checkpoint logged without a final score")
+    ap.add_argument('--out', help="output CSV (default: cpbl_YYYY_scores.csv)")
+    ap.add_argument('--fixtures', help="serve saved box pages from this directory instead of cpbl.com.tw")
+    ap.add_argument('--fallback', help="page served for any game without its own fixture")
+    ap.add_argument('--sync', action='store_true',
+                    help="incremental mode: only fetch games missing from cpbl_YYYY.csv and merge them in")
+    ap.add_argument('--data-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                    help="directory holding cpbl_YYYY.csv (used with --sync)")
+    ap.add_argument('--lookahead', type=int, default=10,
+                    help="with --sync, how many game IDs past the last known game to try (one request each)")
+    ap.add_argument('--archive', help="also keep every fetched page in this raw archive (see archive.py)")
+    args = ap.parse_args(argv)
+
+    out = args.out or f"cpbl_{args.year}_scores.csv"
+    checkpoint = args.checkpoint or f"cpbl_{args.year}_scores.ckpt"
+    base_url = BOX_URL
+    server = None
+    if args.fixtures:
+        server, base_url = serve_fixtures(os.path.abspath(args.fixtures), args.fallback)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    archive = Archive(args.archive) if args.archive else None
+    transport = make_transport(args.transport)
+    if args.sync:
+        try:
+            added = sync_season(args.year, args.data_dir, lookahead=args.lookahead,
+                                transport=transport, workers=args.workers, rate=args.rate,
+                                retries=args.retries, base_url=base_url, archive=archive)
+        finally:
+            transport.close()
+            if server:
+                server.shutdown()
+        print(f"🎉 {args.year} 同步完成，新增 {added} 場")
+        return
+
+    game_ids = [str(i).zfill(3) for i in range(args.first, args.last + 1)]   # "001", ..., "300"
+    try:
+        results = crawl(args.year, game_ids, transport=transport, workers=args.workers,
+                        rate=args.rate, retries=args.retries, checkpoint=checkpoint,
+                        base_url=base_url, archive=archive, skip_empty=args.skip_empty)
     finally:
-        driver.quit()
+        transport.close()
+        if server:
+            server.shutdown()
 
-# 範例測試
+    df = pd.DataFrame(results)
+    df.to_csv(out, index=False, encoding="utf-8-sig")
+    print("🎉 完成，共抓到", len(df), "場")
 
-import pandas as pd
-import time
-
-results = []
-for i in range(1, 301):
-    gid = str(i).zfill(3)           # "001", "002", ..., "300"
-    data = fetch_cpbl_score(gid)
-    if data:
-        results.append(data)
-    time.sleep(0.3)
-
-df = pd.DataFrame(results)
-df.to_csv("cpbl_2022_scores.csv", index=False, encoding="utf-8-sig")
-print("🎉 完成，共抓到", len(df), "場")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Bootstrap and permutation tests for home/away differences.
+
+An alternative to the paired t-test that does not pretend home and away games
+are paired: home and away samples are treated as independent groups. For
+every team and metric at once, resamples are drawn as batched NumPy index
+matrices over the padded (metric, team, game) layout from `stats`, giving
+bootstrap percentile intervals for mean(home) - mean(away) and two-sided
+permutation p-values. Chunks of resamples run on a thread pool (NumPy
+releases the GIL in the gathers and reductions) and are seeded from a
+SeedSequence per chunk, so results depend only on the seed, not on the
+number of workers.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stats import METRICS, team_arrays
+
+CHUNK = 500
+
+
+def _pooled(home, away, n_home, n_away):
+    # per team: home values in [0, n_home), away values in [n_home, n_home + n_away)
+    m, t, _ = home.shape
+    pooled = np.zeros((m, t, max(int((n_home + n_away).max(initial=0)), 1)))
+    hv = np.arange(home.shape[2])[None, :] < n_home[:, None]
+    ti, ji = np.nonzero(hv)
+    pooled[:, ti, ji] = home[:, ti, ji]
+    av = np.arange(away.shape[2])[None, :] < n_away[:, None]
+    ti, ji = np.nonzero(av)
+    pooled[:, ti, n_home[ti] + ji] = away[:, ti, ji]
+    return pooled
+
+
+def _bootstrap_chunk(rng, arr, n, size):
+    # (metric, team, size) resampled means of each team's first n[t] values
+    width = arr.shape[2]
+    idx = (rng.random((len(n), size, width)) * n[:, None, None]).astype(np.int64)
+    valid = np.arange(width)[None, None, :] < n[:, None, None]
+    vals = np.take_along_axis(arr[:, :, None, :], idx[None], axis=3)
+    return np.where(valid[None], vals, 0.0).sum(axis=3) / n[None, :, None]
+
+
+def _chunk(seed, size, home, away, n_home, n_away, pooled, observed):
+    rng = np.random.default_rng(seed)
+    h = np.nan_to_num(home)
+    a = np.nan_to_num(away)
+    boot = _bootstrap_chunk(rng, h, n_home, size) - _bootstrap_chunk(rng, a, n_away, size)
+    # permutation: shuffle pooled labels by sorting random keys; padding sorts last
+    width = pooled.shape[2]
+    total = n_home + n_away
+    keys = rng.random((len(total), size, width))
+    keys[np.broadcast_to(np.arange(width)[None, None, :] >= total[:, None, None], keys.shape)] = 2.0
+    perm = np.argsort(keys, axis=2)
+    shuffled = np.take_along_axis(pooled[:, :, None, :], perm[None], axis=3)
+    first = np.arange(width)[None, None, None, :] < n_home[None, :, None, None]
+    home_sum = np.where(first, shuffled, 0.0).sum(axis=3)
+    grand = pooled.sum(axis=2)[:, :, None]
+    perm_diff = home_sum / n_home[None, :, None] - (grand - home_sum) / n_away[None, :, None]
+    extreme = (np.abs(perm_diff) >= np.abs(observed)[:, :, None] - 1e-12).sum(axis=2)
+    return boot, extreme
+
+
+def resample_tests(df, teams, n_resamples=10_000, seed=0, ci=0.95, metrics=METRICS, workers=None):
+    """Bootstrap CI and permutation p for mean(home) - mean(away), per (team, metric).
+
+    Returns a frame indexed by (team, metric) with columns diff, ci_low,
+    ci_high, p_perm and resamples.
+    """
+    teams = list(teams)
+    home, away, n_home, n_away = team_arrays(df, teams, metrics)
+    ok = (n_home > 0) & (n_away > 0)
+    # teams missing a side get a dummy sample so the batched math stays finite
+    n_h, n_a = np.where(ok, n_home, 1), np.where(ok, n_away, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observed = np.nansum(home, axis=2) / n_h - np.nansum(away, axis=2) / n_a
+    pooled = _pooled(np.nan_to_num(home), np.nan_to_num(away), n_h, n_a)
+
+    sizes = [CHUNK] * (n_resamples // CHUNK) + ([n_resamples % CHUNK] if n_resamples % CHUNK else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = list(pool.map(lambda a: _chunk(a[0], a[1], home, away, n_h, n_a, pooled, observed),
+                              zip(seeds, sizes)))
+    boot = np.concatenate([b for b, _ in parts], axis=2)
+    extreme = sum(e for _, e in parts)
+    tail = (1 - ci) / 2
+    lo, hi = np.quantile(boot, [tail, 1 - tail], axis=2)
+    p = (extreme + 1) / (n_resamples + 1)
+    for arr in (observed, lo, hi, p):
+        arr[:, ~ok] = np.nan
+
+    index = pd.MultiIndex.from_product([teams, list(metrics)], names=['team', 'metric'])
+    flat = lambda a: np.asarray(a).T.reshape(-1)  # (metric, team) -> team-major rows
+    return pd.DataFrame({
+        'diff': flat(observed),
+        'ci_low': flat(lo),
+        'ci_high': flat(hi),
+        'p_perm': flat(p),
+        'resamples': n_resamples,
+    }, index=index)
+
+
+def resample_cube(df_all, n_resamples=10_000, seed=0, metrics=METRICS):
+    """`resample_tests` for every season, indexed by (year, team, metric)."""
+    parts = {}
+    for year, df_year in df_all.groupby('year', sort=True, observed=True):
+        teams = sorted(df_year['home_team'].dropna().unique())
+        parts[int(year)] = resample_tests(df_year, teams, n_resamples,
+                                          seed=[seed, int(year)], metrics=metrics)
+    return pd.concat(parts, names=['year'])
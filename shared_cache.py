@@ -0,0 +1,223 @@
+"""Persistent result cache shared by every app process on a host.
+
+`st.cache_data` lives in one process's memory, so each replica behind a load
+balancer would recompute the metrics on its own. Functions decorated with
+`shared(namespace)` first look in an on-disk backend keyed by a hash of
+(namespace, data version, parameters, SCHEMA); results are pickled. The
+default backend is a SQLite file in WAL mode, safe for concurrent readers and
+writers across processes, evicting least-recently-used entries past a size
+budget.
+
+    CPBL_SHARED_CACHE=sqlite|off     backend (default sqlite)
+    CPBL_CACHE_PATH=/path/cache.db   default <data dir>/.store/shared_cache.sqlite
+    CPBL_CACHE_MAX_MB=256            size budget
+
+Pre-populate at deploy time with `python shared_cache.py warm`: a fresh
+process then starts from the pickled snapshot of the cleaned games, the
+metrics cube and the strength-adjusted home advantage without importing scipy.
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import profiling
+import store
+
+# bump when a cached function's output changes shape, so old entries are ignored
+SCHEMA = 1
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, namespace, value):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'off'}
+
+
+class SQLiteBackend:
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, namespace TEXT, value BLOB,
+                size INTEGER, created REAL, accessed REAL)""")
+            con.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+
+    def _conn(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def get(self, key):
+        con = self._conn()
+        row = con.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        con.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def set(self, key, namespace, value):
+        con = self._conn()
+        now = time.time()
+        con.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, namespace, value, len(value), now, now))
+        self._evict(con)
+
+    def _evict(self, con):
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            for key, size in con.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                if total <= self.max_bytes:
+                    break
+                con.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries")
+
+    def stats(self):
+        n, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {'backend': 'sqlite', 'path': self.path, 'entries': n,
+                'mb': round(size / (1 << 20), 2), 'max_mb': round(self.max_bytes / (1 << 20), 2)}
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend():
+    """The configured backend (created on first use)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            kind = os.environ.get('CPBL_SHARED_CACHE', 'sqlite')
+            if kind == 'off':
+                _backend = NullBackend()
+            else:
+                path = os.environ.get('CPBL_CACHE_PATH') or os.path.join(store.store_dir(), 'shared_cache.sqlite')
+                max_mb = float(os.environ.get('CPBL_CACHE_MAX_MB', 256))
+                _backend = SQLiteBackend(path, int(max_mb * (1 << 20)))
+        return _backend
+
+
+def make_key(namespace, version, params):
+    raw = repr((SCHEMA, namespace, version, params)).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def shared(namespace):
+    """Cache `fn(version, *params)` in the shared backend under `namespace`.
+
+    Parameters are keyed with their defaults filled in, so `fn(v)` and
+    `fn(v, <the defaults>)` share one entry.
+    """
+    def deco(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(version, *params, **kwargs):
+            bound = sig.bind(version, *params, **kwargs)
+            bound.apply_defaults()
+            params = tuple(bound.arguments.values())[1:]
+            key = make_key(namespace, version, params)
+            blob = backend().get(key)
+            if blob is not None:
+                try:
+                    value = pickle.loads(blob)
+                    profiling.cache_event(f'shared:{namespace}')
+                    return value
+                except Exception:
+                    pass  # unreadable entry (e.g. library upgrade): recompute and overwrite
+            profiling.cache_event(f'shared:{namespace}', miss=True)
+            value = fn(version, *params)
+            backend().set(key, namespace, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            return value
+        return wrapper
+    return deco
+
+
+# ---- Shared computations (the same keys from the app and from `warm`) ----
+@shared('games')
+def games(version):
+    return store.load_games()
+
+
+# built from games(version), so each result matches the version it is stored under
+@shared('metrics_cube')
+def metrics_cube(version):
+    import stats
+    df_all, _ = games(version)
+    return stats.metrics_cube(df_all)
+
+
+@shared('resample_cube')
+def resample_cube(version, n_resamples=10_000, seed=0):
+    import resampling
+    df_all, _ = games(version)
+    return resampling.resample_cube(df_all, n_resamples, seed)
+
+
+@shared('adjusted_home_advantage')
+def adjusted_home_advantage(version, target='Score'):
+    import ratings
+    df_all, _ = games(version)
+    return ratings.model(target).fit(df_all, version).home_advantage
+
+
+def warm(resample=True):
+    """Populate the shared cache for the current data version."""
+    version = store.data_version()
+    t0 = time.perf_counter()
+    games(version)
+    metrics_cube(version)
+    for target in ('Win', 'Score'):
+        adjusted_home_advantage(version, target)
+    if resample:
+        resample_cube(version, 10_000, 0)
+    return version, time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Manage the shared CPBL result cache.")
+    ap.add_argument('command', choices=['warm', 'stats', 'clear'])
+    ap.add_argument('--no-resample', action='store_true', help="with warm: skip the bootstrap/permutation cube")
+    args = ap.parse_args(argv)
+    if args.command == 'warm':
+        version, secs = warm(resample=not args.no_resample)
+        print(f"✅ warmed data version {version} in {secs:.1f}s")
+    elif args.command == 'clear':
+        backend().clear()
+        print("✅ cleared")
+    print(backend().stats())
+
+
+if __name__ == '__main__':
+    main()
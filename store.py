@@ -0,0 +1,153 @@
+"""Columnar game store compiled from the raw cpbl_YYYY.csv files.
+
+Each season is written once as an uncompressed Feather (Arrow IPC) partition
+with team names as a shared categorical and win flags precomputed as int8, so
+loading is a memory-mapped read instead of CSV parsing and string mapping.
+A manifest records each source's mtime, size and sha256; a partition is only
+rebuilt when its CSV actually changed.
+"""
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get('CPBL_DATA_DIR', BASE_DIR)
+STORE_DIRNAME = '.store'
+CSV_PATTERN = re.compile(r"cpbl_(\d{4})\.csv$")
+
+TEAM_MAP = {
+    "中信兄弟": "CTBC Brothers",
+    "味全龍": "WeiChuan Dragons",
+    "樂天桃猿": "Rakuten Monkeys",
+    "統一7-ELEVEn獅": "Uni-Lions",
+    "富邦悍將": "Fubon Guardians",
+    "台鋼雄鷹": "TSG Hawks"
+}
+
+
+def store_dir(data_dir=None):
+    return os.path.join(data_dir or DATA_DIR, STORE_DIRNAME)
+
+
+def discover_years(data_dir=None):
+    """Seasons with a cpbl_YYYY.csv in `data_dir`, ascending."""
+    files = os.listdir(data_dir or DATA_DIR)
+    return sorted(int(m.group(1)) for m in map(CSV_PATTERN.match, files) if m)
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_manifest(sdir):
+    try:
+        with open(os.path.join(sdir, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'partitions': {}}
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def compile_season(csv_path, year, team_map=TEAM_MAP):
+    """Parse one raw season CSV into the typed store layout."""
+    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    teams = pd.CategoricalDtype(sorted(set(team_map.values())))
+    out = pd.DataFrame({
+        'game_id': df['game_id'].astype('int16'),
+        'away_team': df['away_team'].map(team_map).astype(teams),
+        'home_team': df['home_team'].map(team_map).astype(teams),
+        'away_score': df['away_score'].astype('int16'),
+        'home_score': df['home_score'].astype('int16'),
+    })
+    out = out.dropna(subset=['home_team', 'away_team']).reset_index(drop=True)
+    out['home_win'] = (out['home_score'] > out['away_score']).astype('int8')
+    out['away_win'] = (out['away_score'] > out['home_score']).astype('int8')
+    out['year'] = pd.Series(year, index=out.index, dtype='int16')
+    return out
+
+
+def build_store(data_dir=None, force=False, team_map=TEAM_MAP):
+    """Bring the store up to date with the CSVs; returns the manifest."""
+    data_dir = data_dir or DATA_DIR
+    sdir = store_dir(data_dir)
+    os.makedirs(sdir, exist_ok=True)
+    manifest = _read_manifest(sdir)
+    old = manifest.get('partitions', {})
+    if manifest.get('team_map') != team_map:
+        force = True
+    parts = {}
+    changed = force
+    for y in discover_years(data_dir):
+        src = os.path.join(data_dir, f"cpbl_{y}.csv")
+        st = os.stat(src)
+        fname = f"year={y}.feather"
+        prev = old.get(str(y))
+        part_ok = prev and os.path.exists(os.path.join(sdir, fname))
+        if not force and part_ok and (prev['mtime_ns'], prev['size']) == (st.st_mtime_ns, st.st_size):
+            parts[str(y)] = prev
+            continue
+        digest = _sha256(src)
+        if not force and part_ok and prev['sha256'] == digest:
+            # touched but not edited: just refresh the recorded mtime
+            parts[str(y)] = dict(prev, mtime_ns=st.st_mtime_ns, size=st.st_size)
+            changed = True
+            continue
+        table = pa.Table.from_pandas(compile_season(src, y, team_map), preserve_index=False)
+        _write_atomic(os.path.join(sdir, fname),
+                      lambda p: feather.write_feather(table, p, compression='uncompressed'))
+        parts[str(y)] = {'file': fname, 'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                         'sha256': digest, 'rows': table.num_rows}
+        changed = True
+    if set(parts) != set(old):
+        changed = True
+    if changed:
+        version = hashlib.sha256(
+            ''.join(f"{y}:{parts[y]['sha256']};" for y in sorted(parts)).encode()
+        ).hexdigest()[:16]
+        manifest = {'version': version, 'team_map': team_map, 'partitions': parts}
+
+        def dump(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+        _write_atomic(os.path.join(sdir, 'manifest.json'), dump)
+    return manifest
+
+
+def data_version(data_dir=None):
+    """Content version of the current data; rebuilds stale partitions first."""
+    return build_store(data_dir).get('version', '')
+
+
+def load_games(data_dir=None, years=None, team_map=TEAM_MAP):
+    """Load the store (building it if needed) as one frame; returns (df_all, years)."""
+    data_dir = data_dir or DATA_DIR
+    manifest = build_store(data_dir, team_map=team_map)
+    parts = manifest['partitions']
+    avail = sorted(int(y) for y in parts)
+    years = [y for y in avail if years is None or y in years]
+    if not years:
+        raise FileNotFoundError(f"no cpbl_YYYY.csv files in {data_dir}")
+    sdir = store_dir(data_dir)
+    tables = [feather.read_table(os.path.join(sdir, parts[str(y)]['file']), memory_map=True)
+              for y in years]
+    df_all = pa.concat_tables(tables).to_pandas()
+    return df_all, years
@@ -0,0 +1,59 @@
+"""HTML renderer for the dashboard's metrics table.
+
+Replaces `DataFrame.to_html` plus string patching on every rerun. The table
+head and a per-column-set row template are compiled once; each row's HTML
+(logo tag included) is cached process-wide under
+(data version, year, method, metric, team, significance flag), so a rerun
+only joins the cached fragments of the rows that survived the filters.
+Output matches the markup `to_html(escape=False, index=False)` produced, with
+floats always shown to three decimals.
+"""
+import math
+from functools import lru_cache
+
+import logos
+import profiling
+
+TABLE_OPEN = '<table style="width:100%;border-collapse:collapse;" border="1" class="dataframe">\n'
+
+
+# rendered row HTML, shared by every session in the process
+ROWS = profiling.LRUCache('table_rows', 4096)
+
+
+@lru_cache(maxsize=None)
+def _head(cols):
+    ths = ''.join(f'      <th>{c}</th>\n' for c in cols)
+    return f'{TABLE_OPEN}  <thead>\n    <tr style="text-align: right;">\n{ths}    </tr>\n  </thead>\n  <tbody>\n'
+
+
+@lru_cache(maxsize=None)
+def _row_template(n):
+    return '    <tr>\n' + ''.join(f'      <td>{{{i}}}</td>\n' for i in range(n)) + '    </tr>\n'
+
+
+def _cell(v):
+    if isinstance(v, float):
+        return 'NaN' if math.isnan(v) else f'{v:.3f}'
+    return str(v)
+
+
+def render(df_disp, cols, key):
+    """Table HTML for the rows of `df_disp` (one per team) in `cols` order.
+
+    `key` identifies what the row values depend on besides the team and its
+    significance flag, e.g. (data version, year, method). The 'Logo' column
+    is filled from the logo registry.
+    """
+    cols = tuple(cols)
+    metric = 'Win' if 'Significant (Win)' in cols else 'Score'
+    sig_col = f'Significant ({metric})'
+    template = _row_template(len(cols))
+    parts = [_head(cols)]
+    for pos, (team, sig) in enumerate(zip(df_disp['Team'], df_disp[sig_col])):
+        def build():
+            row = df_disp.iloc[pos]
+            return template.format(*(logos.logo_img(team) if c == 'Logo' else _cell(row[c]) for c in cols))
+        parts.append(ROWS.get_or_build(key + (metric, team, sig), build))
+    parts.append('  </tbody>\n</table>')
+    return ''.join(parts)
@@ -0,0 +1,110 @@
+"""Season metrics tables built from the precomputed metrics cube.
+
+Shared by the dashboard and the offline report so both show the same
+numbers, rounding and effect-size labels.
+"""
+import numpy as np
+import pandas as pd
+
+WIN_COLS = ['Logo','Team','Home Win Rate','Away Win Rate','Win Rate Diff',
+            't-stat (Win)','p-value (Win)','Cohen d (Win)','Significant (Win)']
+SCORE_COLS = ['Logo','Team','Home Avg Score','Away Avg Score','Score Diff',
+              't-stat (Score)','p-value (Score)','Cohen d (Score)','Significant (Score)']
+
+
+# ---- Helper for Cohen's d classification ----
+def d_size(d):
+    if abs(d) < 0.2: return 'negligible'
+    if abs(d) < 0.5: return 'small'
+    if abs(d) < 0.8: return 'medium'
+    return 'large'
+
+
+def season_results(cube, year):
+    """The cube rows shown for one season, indexed by (team, metric)."""
+    res = cube.loc[year]
+    # only show Hawks if available year
+    if year != 2024:
+        res = res.drop('TSG Hawks', level='team', errors='ignore')
+    return res[(res['n_home'] >= 2) & (res['n_away'] >= 2)]
+
+
+def columns(metric, method='t'):
+    """Displayed columns for 'Win Rate' / 'Score Difference' under a test method."""
+    cols = WIN_COLS if metric == 'Win Rate' else SCORE_COLS
+    if method == 'resample':
+        cols = [c.replace('t-stat', '95% CI') for c in cols]
+    return cols
+
+
+def season_table(cube, year, method='t'):
+    """Display table for one season, one row per team, independent of α."""
+    return team_table(season_results(cube, year), method)
+
+
+def team_table(res, method='t'):
+    """One display row per team from test results indexed by (team, metric).
+
+    With method='resample' the cube must carry the `resampling` columns; the
+    t statistic is replaced by the bootstrap interval and p by the
+    permutation p-value.
+    """
+    recs = []
+    win = res.xs('Win', level='metric')
+    score = res.xs('Score', level='metric')
+    for team in win.index:
+        w, s = win.loc[team], score.loc[team]
+        rec = {
+            'Team': team,
+            'Home Win Rate': round(w['home_mean'], 3),
+            'Away Win Rate': round(w['away_mean'], 3),
+            'Win Rate Diff': round(w['diff'], 3),
+            't-stat (Win)': round(w['t'], 3),
+            'p-value (Win)': round(w['p'], 3),
+            'Cohen d (Win)': d_size(w['d']),
+            'Home Avg Score': round(s['home_mean'], 3),
+            'Away Avg Score': round(s['away_mean'], 3),
+            'Score Diff': round(s['diff'], 3),
+            't-stat (Score)': round(s['t'], 3),
+            'p-value (Score)': round(s['p'], 3),
+            'Cohen d (Score)': d_size(s['d']),
+            # unrounded p-values, thresholded against α on each rerun
+            '_p (Win)': w['p'],
+            '_p (Score)': s['p']
+        }
+        if method == 'resample':
+            for m, r in (('Win', w), ('Score', s)):
+                del rec[f't-stat ({m})']
+                rec[f'95% CI ({m})'] = f"[{r['ci_low']:.3f}, {r['ci_high']:.3f}]"
+                rec[f'p-value ({m})'] = round(r['p_perm'], 3)
+                rec[f'_p ({m})'] = r['p_perm']
+        recs.append(rec)
+    return pd.DataFrame(recs)
+
+
+def results_records(res, alpha=None):
+    """JSON-ready per-team records (NaN -> None); flags significance when α is given."""
+    clean = lambda v: None if pd.isna(v) else float(v)
+    out = []
+    for team, grp in res.groupby(level='team', sort=False, observed=True):
+        rec = {'team': team}
+        for metric, r in grp.droplevel('team').iterrows():
+            m = {
+                'n_home': int(r['n_home']), 'n_away': int(r['n_away']), 'n_pairs': int(r['n']),
+                'home': clean(r['home_mean']), 'away': clean(r['away_mean']),
+                'diff': clean(r['diff']), 't': clean(r['t']), 'p': clean(r['p']),
+                'cohen_d': clean(r['d']), 'effect': d_size(r['d']),
+            }
+            if alpha is not None:
+                m['significant'] = bool(r['p'] < alpha)
+            rec[metric.lower()] = m
+        out.append(rec)
+    return out
+
+
+# ---- Significance flags: a lookup against the cached table, no recomputation ----
+def mark_significance(mt, alpha):
+    mt = mt.copy()
+    for m in ('Win', 'Score'):
+        mt[f'Significant ({m})'] = np.where(mt[f'_p ({m})'] < alpha, '★', '')
+    return mt
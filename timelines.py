@@ -0,0 +1,73 @@
+"""Season form timelines for every team at once.
+
+Built from the `GameIndex` frame, where each (year, team) season is a
+contiguous run of rows in game order. One cumulative sum over the stacked
+per-game columns gives both the running totals (difference against the
+season's first row) and the rolling last-N totals (difference against the row
+N games back, clamped to the season start), so cumulative and rolling win
+rate, run differential and home/away splits come out for every team and
+season without a per-team loop.
+"""
+import numpy as np
+import pandas as pd
+
+# display label -> timeline column
+MEASURES = {
+    'Cumulative win rate': 'cum_win_rate',
+    'Rolling win rate': 'roll_win_rate',
+    'Cumulative run differential': 'cum_run_diff',
+    'Rolling run differential (per game)': 'roll_run_diff',
+    'Home win rate (to date)': 'home_win_rate',
+    'Away win rate (to date)': 'away_win_rate',
+}
+
+
+def team_timelines(index, window=10):
+    """Per-game form for every (year, team), in the index's row order.
+
+    Columns: year, team, game (1-based within the season), game_id, opponent,
+    is_home, win, run_diff and the MEASURES columns. Rolling columns cover
+    the last `window` games (fewer at the start of a season).
+    """
+    f = index.frame
+    n = len(f)
+    bounds = np.array(sorted(index.offsets.values()), dtype=np.int64).reshape(-1, 2)
+    starts = np.repeat(bounds[:, 0], bounds[:, 1] - bounds[:, 0])
+    pos = np.arange(n)
+    lo = np.maximum(pos + 1 - window, starts)
+
+    win = f['win'].to_numpy(np.int64)
+    run_diff = f['runs_for'].to_numpy(np.int64) - f['runs_against'].to_numpy(np.int64)
+    home = f['is_home'].to_numpy(np.int64)
+    # columns: win, run diff, home games, home wins, away wins
+    cs = np.zeros((n + 1, 5), np.int64)
+    np.cumsum(np.stack([win, run_diff, home, home * win, (1 - home) * win], axis=1), axis=0, out=cs[1:])
+    cum = cs[pos + 1] - cs[starts]
+    roll = cs[pos + 1] - cs[lo]
+    games = pos + 1 - starts
+    home_games = cum[:, 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        home_rate = cum[:, 3] / home_games
+        away_rate = cum[:, 4] / (games - home_games)
+
+    return pd.DataFrame({
+        'year': f['year'].to_numpy(),
+        'team': f['team'].to_numpy(),
+        'game': games.astype(np.int16),
+        'game_id': f['game_id'].to_numpy(),
+        'opponent': f['opponent'].to_numpy(),
+        'is_home': f['is_home'].to_numpy(),
+        'win': win.astype(np.int8),
+        'run_diff': run_diff.astype(np.int16),
+        'cum_win_rate': cum[:, 0] / games,
+        'roll_win_rate': roll[:, 0] / (pos + 1 - lo),
+        'cum_run_diff': cum[:, 1].astype(np.int32),
+        'roll_run_diff': roll[:, 1] / (pos + 1 - lo),
+        'home_win_rate': home_rate,
+        'away_win_rate': away_rate,
+    })
+
+
+def select(timelines, year, teams):
+    """Rows for `teams` in one season, ready to overlay on a chart."""
+    return timelines[(timelines['year'] == year) & timelines['team'].isin(list(teams))]